@@ -10,24 +10,43 @@ import argparse
 import datetime as dt
 import json
 import os
+import random
 import re
 import subprocess
 import sys
+import tempfile
 import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any
 
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
 
 OPERATION_LOG_MARKER = "flowsmith-operation-log"
 DEFAULT_LOCK_LABEL = "agent/running"
 DEFAULT_SERVICE_LABEL_PREFIX = "agent/service:"
 DEFAULT_OPERATION_LABEL_PREFIX = "agent/op:"
+RUN_MARKER_LABEL_PREFIX = "agent/run:"
 DEFAULT_MAX_PARALLEL = 2
 DEFAULT_POLL_SECONDS = 20
 DEFAULT_TIMEOUT_MINUTES = 180
 DEFAULT_STALE_MINUTES = 360
 DEFAULT_COOLDOWN_MINUTES = 30
 DEFAULT_LIST_LIMIT = 100
+# GitHub の secondary rate limit を避けるため、コメント取得の同時実行数を抑える。
+MAX_COMMENT_FETCH_WORKERS = 8
+POLL_MIN_SECONDS = 5
+POLL_BACKOFF_MAX_EXPONENT = 5
+POLL_JITTER_RATIO = 0.2
+# REST の Issue 応答から判定に使う項目だけを残し、Python 側でデコードする量を抑える。
+ISSUE_INFO_JQ = "{number, updatedAt: .updated_at, labels: [.labels[].name]}"
+COOLDOWN_CACHE_ENV = "FLOWSMITH_COOLDOWN_CACHE"
+COOLDOWN_CACHE_FILENAME = "flowsmith-cooldown.json"
 
 
 def log(message: str) -> None:
@@ -52,14 +71,70 @@ def run_process(args: list[str], *, check: bool) -> subprocess.CompletedProcess[
     return proc
 
 
+def run_process_bytes(
+    args: list[str],
+    *,
+    check: bool,
+    capture_stderr: bool = True,
+) -> subprocess.CompletedProcess[bytes]:
+    # JSON 応答は bytes のまま JSON パーサに渡し、文字列へのデコードを挟まない。
+    # stderr はエラー報告にだけ使うため、不要な呼び出しでは捨てる。
+    with subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+    ) as popen:
+        stdout, stderr = popen.communicate()
+    proc = subprocess.CompletedProcess(args, popen.returncode, stdout, stderr or b"")
+    if check and proc.returncode != 0:
+        joined = " ".join(args)
+        raise RuntimeError(
+            f"Command failed: {joined}\n"
+            f"exit={proc.returncode}\n"
+            f"stdout:\n{proc.stdout.decode('utf-8', errors='replace')}\n"
+            f"stderr:\n{proc.stderr.decode('utf-8', errors='replace')}"
+        )
+    return proc
+
+
 def run_gh(args: list[str], *, check: bool = True) -> subprocess.CompletedProcess[str]:
     return run_process(["gh", *args], check=check)
 
 
+def run_gh_json(
+    args: list[str],
+    *,
+    check: bool = True,
+    capture_stderr: bool = True,
+) -> subprocess.CompletedProcess[bytes]:
+    return run_process_bytes(["gh", *args], check=check, capture_stderr=capture_stderr)
+
+
+def _fast_parse_gh_ts(text: str) -> dt.datetime | None:
+    # GitHub API は "YYYY-MM-DDTHH:MM:SSZ" 固定で返すため、汎用パーサを通さずに組み立てる。
+    if len(text) != 20 or text[-1] != "Z" or text[10] != "T":
+        return None
+    try:
+        return dt.datetime(
+            int(text[0:4]),
+            int(text[5:7]),
+            int(text[8:10]),
+            int(text[11:13]),
+            int(text[14:16]),
+            int(text[17:19]),
+            tzinfo=dt.timezone.utc,
+        )
+    except ValueError:
+        return None
+
+
 def parse_time(value: str) -> dt.datetime | None:
     text = str(value or "").strip()
     if not text:
         return None
+    fast = _fast_parse_gh_ts(text)
+    if fast is not None:
+        return fast
     try:
         if text.endswith("Z"):
             text = text[:-1] + "+00:00"
@@ -75,13 +150,23 @@ def to_iso8601(value: dt.datetime) -> str:
     return value.astimezone(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def load_json_stdout(proc: subprocess.CompletedProcess[str], *, where: str) -> Any:
+def load_json_stdout(proc: subprocess.CompletedProcess[Any], *, where: str) -> Any:
+    # orjson が入っていれば使う。orjson.JSONDecodeError は json.JSONDecodeError のサブクラス。
     try:
-        return json.loads(proc.stdout or "null")
+        if orjson is not None:
+            return orjson.loads(proc.stdout or b"null")
+        return json.loads(proc.stdout or b"null")
     except json.JSONDecodeError as err:
         raise RuntimeError(f"Invalid JSON from {where}") from err
 
 
+def split_repo(repo: str) -> tuple[str, str]:
+    owner, _, name = repo.partition("/")
+    if not owner or not name or "/" in name:
+        raise RuntimeError(f"repo must be in owner/name form: {repo}")
+    return owner, name
+
+
 def normalize_repo_and_issue(repo_value: str, issue_value: int) -> tuple[str, int]:
     repo = str(repo_value or "").strip()
     issue_number = int(issue_value)
@@ -89,6 +174,7 @@ def normalize_repo_and_issue(repo_value: str, issue_value: int) -> tuple[str, in
         raise RuntimeError("repo is required.")
     if issue_number <= 0:
         raise RuntimeError("issue-number must be positive.")
+    split_repo(repo)
     return repo, issue_number
 
 
@@ -97,17 +183,42 @@ def parse_label_names(labels_raw: Any) -> set[str]:
         return set()
     labels: set[str] = set()
     for item in labels_raw:
-        if not isinstance(item, dict):
+        # REST の --jq 整形では名前の配列、gh issue/GraphQL では {name: ...} の配列で届く。
+        if isinstance(item, str):
+            name = item.strip()
+        elif isinstance(item, dict):
+            name = str(item.get("name") or "").strip()
+        else:
             continue
-        name = str(item.get("name") or "").strip()
         if name:
             labels.add(name)
     return labels
 
 
+_ensured_labels: set[tuple[str, str]] = set()
+
+
+def build_run_marker_label(run_id: str) -> str:
+    text = str(run_id or "").strip()
+    return f"{RUN_MARKER_LABEL_PREFIX}{text}" if text else ""
+
+
+def delete_label(repo: str, label: str) -> None:
+    proc = run_gh(["label", "delete", label, "--repo", repo, "--yes"], check=False)
+    _ensured_labels.discard((repo, label))
+    if proc.returncode == 0:
+        return
+    detail = (proc.stderr or proc.stdout or "").lower()
+    if "not found" in detail:
+        return
+    raise RuntimeError(f"Unable to delete label '{label}' on {repo}: {proc.stderr or proc.stdout}")
+
+
 def ensure_label_exists(repo: str, label: str) -> None:
     if not label:
         raise RuntimeError("Label name is empty.")
+    if (repo, label) in _ensured_labels:
+        return
     proc = run_gh(
         [
             "label",
@@ -122,10 +233,9 @@ def ensure_label_exists(repo: str, label: str) -> None:
         ],
         check=False,
     )
-    if proc.returncode == 0:
-        return
     detail = (proc.stderr or proc.stdout or "").lower()
-    if "already exists" in detail:
+    if proc.returncode == 0 or "already exists" in detail:
+        _ensured_labels.add((repo, label))
         return
     raise RuntimeError(f"Unable to ensure label '{label}' on {repo}: {proc.stderr or proc.stdout}")
 
@@ -136,6 +246,20 @@ class IssueInfo:
     updated_at: dt.datetime | None
     labels: set[str]
 
+    @classmethod
+    def from_graphql_node(cls, node: Any) -> IssueInfo | None:
+        if not isinstance(node, dict):
+            return None
+        labels_raw = node.get("labels")
+        label_nodes = labels_raw.get("nodes") if isinstance(labels_raw, dict) else None
+        return parse_issue_info(
+            {
+                "number": node.get("number"),
+                "updatedAt": node.get("updatedAt"),
+                "labels": label_nodes,
+            }
+        )
+
 
 def parse_issue_info(payload: Any) -> IssueInfo | None:
     if not isinstance(payload, dict):
@@ -149,107 +273,133 @@ def parse_issue_info(payload: Any) -> IssueInfo | None:
 
 
 def get_issue(repo: str, issue_number: int) -> IssueInfo:
-    proc = run_gh(
-        [
-            "issue",
-            "view",
-            str(issue_number),
-            "--repo",
-            repo,
-            "--json",
-            "number,updatedAt,labels",
-        ]
-    )
-    payload = load_json_stdout(proc, where="gh issue view")
+    proc = run_gh_json(["api", f"repos/{repo}/issues/{issue_number}", "--jq", ISSUE_INFO_JQ])
+    payload = load_json_stdout(proc, where="gh api issues/{number}")
     issue = parse_issue_info(payload)
     if issue is None:
         raise RuntimeError("Issue payload is invalid.")
     return issue
 
 
-def list_open_issues_with_label(
+LOCK_STATE_QUERY = """
+query($owner: String!, $name: String!, $issue: Int!, $label: String!, $limit: Int!) {
+  repository(owner: $owner, name: $name) {
+    issue(number: $issue) {
+      number
+      updatedAt
+      labels(first: 50) { nodes { name } }
+    }
+    lockedIssues: issues(first: $limit, labels: [$label], states: OPEN) {
+      nodes {
+        number
+        updatedAt
+        labels(first: 20) { nodes { name } }
+      }
+    }
+  }
+}
+"""
+
+
+def run_gh_graphql(query: str, variables: dict[str, str | int]) -> Any:
+    cmd = ["api", "graphql", "-f", f"query={query}"]
+    for key, value in variables.items():
+        # -F は数値を型付きで送るため Int 変数に使う。
+        flag = "-F" if isinstance(value, int) else "-f"
+        cmd.extend([flag, f"{key}={value}"])
+    proc = run_gh_json(cmd)
+    payload = load_json_stdout(proc, where="gh api graphql")
+    if not isinstance(payload, dict):
+        raise RuntimeError("GraphQL response is invalid.")
+    errors = payload.get("errors")
+    if errors:
+        raise RuntimeError(f"GraphQL query failed: {errors}")
+    data = payload.get("data")
+    if not isinstance(data, dict):
+        raise RuntimeError("GraphQL response has no data.")
+    return data
+
+
+def fetch_lock_state(
     repo: str,
-    label: str,
+    issue_number: int,
+    lock_label: str,
     *,
     limit: int = DEFAULT_LIST_LIMIT,
-) -> list[IssueInfo]:
-    proc = run_gh(
-        [
-            "issue",
-            "list",
-            "--repo",
-            repo,
-            "--state",
-            "open",
-            "--label",
-            label,
-            "--limit",
-            str(limit),
-            "--json",
-            "number,updatedAt,labels",
-        ]
+) -> tuple[IssueInfo, list[IssueInfo]]:
+    owner, name = split_repo(repo)
+    data = run_gh_graphql(
+        LOCK_STATE_QUERY,
+        {
+            "owner": owner,
+            "name": name,
+            "issue": issue_number,
+            "label": lock_label,
+            "limit": limit,
+        },
     )
-    payload = load_json_stdout(proc, where="gh issue list")
-    if not isinstance(payload, list):
-        return []
-    issues: list[IssueInfo] = []
-    for item in payload:
-        parsed = parse_issue_info(item)
+    repository = data.get("repository")
+    if not isinstance(repository, dict):
+        raise RuntimeError(f"Repository not found: {repo}")
+    issue = IssueInfo.from_graphql_node(repository.get("issue"))
+    if issue is None:
+        raise RuntimeError("Issue payload is invalid.")
+
+    locked_raw = repository.get("lockedIssues")
+    nodes = locked_raw.get("nodes") if isinstance(locked_raw, dict) else None
+    locked_issues: list[IssueInfo] = []
+    for node in nodes if isinstance(nodes, list) else []:
+        parsed = IssueInfo.from_graphql_node(node)
         if parsed is not None:
-            issues.append(parsed)
-    return issues
+            locked_issues.append(parsed)
+    return issue, locked_issues
 
 
-def add_issue_label(repo: str, issue_number: int, label: str) -> None:
-    run_gh(
-        [
-            "issue",
-            "edit",
-            str(issue_number),
-            "--repo",
-            repo,
-            "--add-label",
-            label,
-        ]
-    )
+def add_issue_labels(
+    repo: str,
+    issue_number: int,
+    labels: list[str],
+) -> None:
+    # gh issue edit は現在のラベルを取得してから置き換えるため、追加だけを行う REST API を直接呼ぶ。
+    cmd = ["api", "-X", "POST", f"repos/{repo}/issues/{issue_number}/labels"]
+    for label in labels:
+        cmd.extend(["-f", f"labels[]={label}"])
+    run_gh(cmd)
 
 
-def remove_issue_label(repo: str, issue_number: int, label: str) -> None:
+def remove_issue_label(
+    repo: str,
+    issue_number: int,
+    label: str,
+) -> None:
+    encoded = urllib.parse.quote(label, safe="")
     proc = run_gh(
-        [
-            "issue",
-            "edit",
-            str(issue_number),
-            "--repo",
-            repo,
-            "--remove-label",
-            label,
-        ],
+        ["api", "-X", "DELETE", f"repos/{repo}/issues/{issue_number}/labels/{encoded}"],
         check=False,
     )
     if proc.returncode == 0:
         return
     detail = (proc.stderr or proc.stdout or "").lower()
-    if "not found" in detail or "no such label" in detail or "does not have label" in detail:
+    if "not found" in detail or "does not exist" in detail or "http 404" in detail:
         return
     raise RuntimeError(f"Unable to remove label '{label}' from issue #{issue_number}: {proc.stderr or proc.stdout}")
 
 
-def cleanup_stale_locks(
+def prune_stale_locks(
     *,
     repo: str,
     lock_label: str,
     stale_minutes: int,
-) -> int:
+    locked_issues: list[IssueInfo],
+) -> list[IssueInfo]:
     if stale_minutes <= 0:
-        return 0
+        return list(locked_issues)
     now = dt.datetime.now(dt.timezone.utc)
     stale_delta = dt.timedelta(minutes=stale_minutes)
-    removed = 0
-    for issue in list_open_issues_with_label(repo, lock_label):
-        if issue.updated_at is None:
-            continue
-        if now - issue.updated_at < stale_delta:
+    remaining: list[IssueInfo] = []
+    for issue in locked_issues:
+        if issue.updated_at is None or now - issue.updated_at < stale_delta:
+            remaining.append(issue)
             continue
         log(
             "Removing stale lock label "
@@ -257,8 +407,8 @@ def cleanup_stale_locks(
             f"(updated_at={to_iso8601(issue.updated_at)})"
         )
         remove_issue_label(repo, issue.number, lock_label)
-        removed += 1
-    return removed
+        issue.labels.discard(lock_label)
+    return remaining
 
 
 def detect_service_and_operation_labels(
@@ -269,10 +419,11 @@ def detect_service_and_operation_labels(
 ) -> tuple[str, str]:
     service_label = ""
     operation_label = ""
-    for label in sorted(labels):
-        if not service_label and label.startswith(service_prefix):
+    # 複数候補がある場合は従来どおり辞書順で最小のラベルを選ぶ（set の反復順に依存させない）。
+    for label in labels:
+        if label.startswith(service_prefix) and (not service_label or label < service_label):
             service_label = label
-        if not operation_label and label.startswith(operation_prefix):
+        if label.startswith(operation_prefix) and (not operation_label or label < operation_label):
             operation_label = label
     return service_label, operation_label
 
@@ -281,28 +432,36 @@ def list_issue_numbers_for_labels(
     *,
     repo: str,
     labels: list[str],
+    updated_since: dt.datetime | None = None,
     limit: int = DEFAULT_LIST_LIMIT,
 ) -> list[int]:
-    cmd = [
-        "issue",
-        "list",
-        "--repo",
-        repo,
-        "--state",
-        "all",
-        "--limit",
-        str(limit),
-        "--json",
-        "number",
-    ]
-    for label in labels:
-        cmd.extend(["--label", label])
-    proc = run_gh(cmd)
-    payload = load_json_stdout(proc, where="gh issue list for cooldown")
-    if not isinstance(payload, list):
+    qualifiers = [f"repo:{repo}", "is:issue"]
+    qualifiers.extend(f'label:"{label}"' for label in labels)
+    if updated_since is not None:
+        qualifiers.append(f"updated:>={to_iso8601(updated_since)}")
+    proc = run_gh_json(
+        [
+            "api",
+            "-X",
+            "GET",
+            "search/issues",
+            "-f",
+            "q=" + " ".join(qualifiers),
+            # 操作記録コメントを付けた Issue ほど更新日時が新しいため、新しい順に並べて早期終了を効かせる。
+            "-f",
+            "sort=updated",
+            "-f",
+            "order=desc",
+            "-f",
+            f"per_page={min(limit, 100)}",
+        ]
+    )
+    payload = load_json_stdout(proc, where="gh api search/issues for cooldown")
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
         return []
     numbers: list[int] = []
-    for item in payload:
+    for item in items:
         if not isinstance(item, dict):
             continue
         number = int(item.get("number") or 0)
@@ -319,51 +478,186 @@ OPERATION_LOG_PATTERN = re.compile(
 )
 
 
+def parse_operation_marker(body: str) -> tuple[str, str, str] | None:
+    # release_lock が書く固定書式は「マーカー key=value ... -->」の 1 行なので、分割だけで読める。
+    # 手書き・大小文字違いなど書式が崩れた場合のみ正規表現で拾う。
+    start = body.find(OPERATION_LOG_MARKER)
+    if start >= 0:
+        tail = body[start + len(OPERATION_LOG_MARKER) :]
+        fields: dict[str, str] = {}
+        for token in tail.partition("-->")[0].split():
+            key, sep, value = token.partition("=")
+            if sep:
+                fields[key] = value
+        service = fields.get("service")
+        operation = fields.get("operation")
+        executed_at = fields.get("executed_at")
+        if service and operation and executed_at:
+            return service, operation, executed_at
+    match = OPERATION_LOG_PATTERN.search(body)
+    if not match:
+        return None
+    return match.group("service"), match.group("operation"), match.group("executed_at")
+
+
+def fetch_issue_comments(
+    repo: str,
+    issue_number: int,
+    *,
+    since: dt.datetime | None = None,
+) -> list[dict[str, Any]]:
+    endpoint = f"repos/{repo}/issues/{issue_number}/comments?per_page=100"
+    if since is not None:
+        endpoint += f"&since={to_iso8601(since)}"
+    proc = run_gh_json(["api", endpoint], check=False, capture_stderr=False)
+    if proc.returncode != 0:
+        return []
+    payload = load_json_stdout(proc, where="gh api issue comments")
+    if not isinstance(payload, list):
+        return []
+    return [item for item in payload if isinstance(item, dict)]
+
+
+def latest_marker_timestamp(
+    comments: list[dict[str, Any]],
+    *,
+    service_label: str,
+    operation_label: str,
+) -> dt.datetime | None:
+    latest: dt.datetime | None = None
+    for item in comments:
+        body = str(item.get("body") or "")
+        # マーカーは release_lock が固定表記で書き込むため、大半のコメントは部分一致だけで除外できる。
+        # 大小文字違いの手書きマーカーも parse_operation_marker の正規表現へ渡せるよう、
+        # 完全一致しない場合だけ小文字化して判定する。
+        if OPERATION_LOG_MARKER not in body and OPERATION_LOG_MARKER not in body.lower():
+            continue
+        marker = parse_operation_marker(body)
+        if marker is None:
+            continue
+        marker_service, marker_operation, marker_executed_at = marker
+        if marker_service != service_label or marker_operation != operation_label:
+            continue
+        executed_at = parse_time(marker_executed_at)
+        if executed_at is None:
+            continue
+        if latest is None or executed_at > latest:
+            latest = executed_at
+    return latest
+
+
+def resolve_cooldown_cache_path() -> str:
+    explicit = os.environ.get(COOLDOWN_CACHE_ENV, "").strip()
+    if explicit:
+        return explicit
+    runner_temp = os.environ.get("RUNNER_TEMP", "").strip()
+    if runner_temp:
+        return os.path.join(runner_temp, COOLDOWN_CACHE_FILENAME)
+    return ""
+
+
+def cooldown_cache_key(repo: str, service_label: str, operation_label: str) -> str:
+    return f"{repo}|{service_label}|{operation_label}"
+
+
+def load_cooldown_cache(path: str) -> dict[str, str]:
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict):
+        return {}
+    return {str(key): str(value) for key, value in payload.items()}
+
+
+def record_cooldown_cache(
+    *,
+    repo: str,
+    service_label: str,
+    operation_label: str,
+    executed_at: dt.datetime,
+) -> None:
+    path = resolve_cooldown_cache_path()
+    if not path:
+        return
+    entries = load_cooldown_cache(path)
+    key = cooldown_cache_key(repo, service_label, operation_label)
+    current = parse_time(entries.get(key, ""))
+    if current is not None and current >= executed_at:
+        return
+    entries[key] = to_iso8601(executed_at)
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # 同じ runner 上の並行ジョブが読み途中のファイルを見ないよう、一時ファイル経由で置き換える。
+        fd, temp_path = tempfile.mkstemp(prefix=".flowsmith-cooldown-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(entries, handle, ensure_ascii=False, sort_keys=True)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError as exc:
+        log(f"Skipped cooldown cache update ({path}): {exc}")
+
+
 def find_latest_operation_timestamp(
     *,
     repo: str,
     service_label: str,
     operation_label: str,
+    cooldown_minutes: int,
     issue_limit: int = 80,
 ) -> dt.datetime | None:
-    if not service_label or not operation_label:
+    if not service_label or not operation_label or cooldown_minutes <= 0:
         return None
-    latest: dt.datetime | None = None
+    # クールダウン窓より古い記録は待機判定に影響しないため、窓内に更新された Issue/コメントだけを見る。
+    since = dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=cooldown_minutes)
+    # キャッシュはクールダウン中であることの根拠にだけ使う。窓外・未記録なら他 runner の記録が
+    # あり得るため、API で確認する。
+    cached_at = parse_time(
+        load_cooldown_cache(resolve_cooldown_cache_path()).get(
+            cooldown_cache_key(repo, service_label, operation_label), ""
+        )
+    )
+    if cached_at is not None and cached_at >= since:
+        return cached_at
     issue_numbers = list_issue_numbers_for_labels(
         repo=repo,
         labels=[service_label, operation_label],
+        updated_since=since,
         limit=issue_limit,
     )
-    for issue_number in issue_numbers:
-        proc = run_gh(
-            [
-                "api",
-                f"repos/{repo}/issues/{issue_number}/comments?per_page=100",
-            ],
-            check=False,
+    if not issue_numbers:
+        return None
+    executor = ThreadPoolExecutor(max_workers=min(MAX_COMMENT_FETCH_WORKERS, len(issue_numbers)))
+    try:
+        comment_lists = executor.map(
+            lambda number: fetch_issue_comments(repo, number, since=since),
+            issue_numbers,
         )
-        if proc.returncode != 0:
-            continue
-        payload = load_json_stdout(proc, where="gh api issue comments")
-        if not isinstance(payload, list):
-            continue
-        for item in payload:
-            if not isinstance(item, dict):
-                continue
-            body = str(item.get("body") or "")
-            match = OPERATION_LOG_PATTERN.search(body)
-            if not match:
-                continue
-            if match.group("service") != service_label:
-                continue
-            if match.group("operation") != operation_label:
-                continue
-            executed_at = parse_time(match.group("executed_at"))
-            if executed_at is None:
-                continue
-            if latest is None or executed_at > latest:
-                latest = executed_at
-    return latest
+        for comments in comment_lists:
+            executed_at = latest_marker_timestamp(
+                comments,
+                service_label=service_label,
+                operation_label=operation_label,
+            )
+            # 窓内の記録が 1 件でもあればクールダウン中と判定できるため、残りの取得は打ち切る。
+            if executed_at is not None and executed_at >= since:
+                record_cooldown_cache(
+                    repo=repo,
+                    service_label=service_label,
+                    operation_label=operation_label,
+                    executed_at=executed_at,
+                )
+                return executed_at
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None
 
 
 def calculate_cooldown_wait_seconds(
@@ -387,25 +681,47 @@ def build_wait_reason_text(
     running_count: int,
     max_parallel: int,
     cooldown_wait_seconds: int,
+    cooldown_evaluated: bool = True,
 ) -> str:
     reasons: list[str] = []
     if issue_locked:
         reasons.append(f"issue is locked ({lock_label})")
     if running_count >= max_parallel:
         reasons.append(f"repo parallel limit reached ({running_count}/{max_parallel})")
-    if cooldown_wait_seconds > 0:
+    if not cooldown_evaluated:
+        reasons.append("cooldown not evaluated")
+    elif cooldown_wait_seconds > 0:
         reasons.append(f"operation cooldown active ({cooldown_wait_seconds}s)")
     return ", ".join(reasons) or "unknown"
 
 
+def calculate_poll_delay_seconds(*, attempt: int, poll_seconds: int) -> float:
+    # 競合解消直後は短い間隔で再確認し、待機が続くほど poll_seconds まで間隔を広げる。
+    # 待機者が同じ位相で一斉に API を叩かないよう、±20% の揺らぎを加える。
+    # API のレート制限を守るため、揺らぎを含めても POLL_MIN_SECONDS より短くはしない。
+    backoff = float(POLL_MIN_SECONDS * 2 ** min(max(attempt, 0), POLL_BACKOFF_MAX_EXPONENT))
+    base = min(float(max(poll_seconds, POLL_MIN_SECONDS)), backoff)
+    return max(float(POLL_MIN_SECONDS), base * random.uniform(1.0 - POLL_JITTER_RATIO, 1.0 + POLL_JITTER_RATIO))
+
+
 def write_outputs(outputs: dict[str, str], github_output: str) -> None:
     if not github_output:
         return
     path = os.path.abspath(github_output)
-    with open(path, "a", encoding="utf-8") as handle:
-        for key, value in outputs.items():
-            safe = str(value).replace("\n", " ").strip()
-            handle.write(f"{key}={safe}\n")
+    lines: list[str] = []
+    for key, value in outputs.items():
+        safe = str(value).replace("\n", " ").strip()
+        lines.append(f"{key}={safe}\n")
+    data = "".join(lines).encode("utf-8")
+    # GITHUB_OUTPUT は他ステップと共有されるため、追記モードで 1 回の write にまとめる。
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
 
 
 def acquire_lock(args: argparse.Namespace) -> int:
@@ -413,7 +729,7 @@ def acquire_lock(args: argparse.Namespace) -> int:
 
     lock_label = str(args.lock_label).strip() or DEFAULT_LOCK_LABEL
     max_parallel = max(int(args.max_parallel), 1)
-    poll_seconds = max(int(args.poll_seconds), 5)
+    poll_seconds = max(int(args.poll_seconds), POLL_MIN_SECONDS)
     timeout_minutes = max(int(args.timeout_minutes), 1)
     stale_minutes = max(int(args.stale_minutes), 0)
     cooldown_minutes = max(int(args.cooldown_minutes), 0)
@@ -421,18 +737,31 @@ def acquire_lock(args: argparse.Namespace) -> int:
     operation_prefix = str(args.operation_label_prefix).strip() or DEFAULT_OPERATION_LABEL_PREFIX
 
     ensure_label_exists(repo, lock_label)
+    # 同じ run の再実行では、前回付けたロックを自分のものとして引き継げるよう run 単位の目印を併記する。
+    # 目印ラベルの定義は事前に作らない。解放処理はロック取得時にしか走らないため、待機のタイムアウトや
+    # 失敗で定義だけが残り続けるのを防ぐ。未定義のラベルは issues/{n}/labels への追加時に作成される。
+    run_marker_label = build_run_marker_label(args.run_id)
 
+    poll_attempt = 0
+    previous_running_count: int | None = None
     start_at = dt.datetime.now(dt.timezone.utc)
     deadline = start_at + dt.timedelta(minutes=timeout_minutes)
     while True:
-        cleanup_stale_locks(
+        issue, locked_issues = fetch_lock_state(repo, issue_number, lock_label)
+        # stale 判定と実行中件数の算出は同じ一覧を使い、除去した Issue はその場で一覧から外す。
+        running_issues = prune_stale_locks(
             repo=repo,
             lock_label=lock_label,
             stale_minutes=stale_minutes,
+            locked_issues=locked_issues,
         )
-        issue = get_issue(repo, issue_number)
-        running_issues = list_open_issues_with_label(repo, lock_label)
+        stale_numbers = {item.number for item in locked_issues} - {item.number for item in running_issues}
+        if issue_number in stale_numbers:
+            issue.labels.discard(lock_label)
         running_count = len(running_issues)
+        if previous_running_count is not None and running_count < previous_running_count:
+            poll_attempt = 0
+        previous_running_count = running_count
         issue_locked = lock_label in issue.labels
 
         service_label, operation_label = detect_service_and_operation_labels(
@@ -441,28 +770,47 @@ def acquire_lock(args: argparse.Namespace) -> int:
             operation_prefix=operation_prefix,
         )
 
+        # クールダウン判定はコメント走査を伴い最も重いため、ロックと並列上限を通過した場合のみ行う。
         cooldown_wait_seconds = 0
-        if cooldown_minutes > 0 and service_label and operation_label:
-            last_executed_at = find_latest_operation_timestamp(
-                repo=repo,
-                service_label=service_label,
-                operation_label=operation_label,
-            )
-            cooldown_wait_seconds = calculate_cooldown_wait_seconds(
-                cooldown_minutes=cooldown_minutes,
-                last_executed_at=last_executed_at,
-            )
-
-        if not issue_locked and running_count < max_parallel and cooldown_wait_seconds <= 0:
-            log(
-                "Acquiring lock "
-                f"repo={repo} issue=#{issue_number} label={lock_label} "
-                f"running={running_count}/{max_parallel}"
-            )
-            add_issue_label(repo, issue_number, lock_label)
-            verify = get_issue(repo, issue_number)
-            if lock_label not in verify.labels:
-                raise RuntimeError("Lock label was not added.")
+        cooldown_evaluated = False
+        if not issue_locked and running_count < max_parallel:
+            cooldown_evaluated = True
+            if cooldown_minutes > 0 and service_label and operation_label:
+                last_executed_at = find_latest_operation_timestamp(
+                    repo=repo,
+                    service_label=service_label,
+                    operation_label=operation_label,
+                    cooldown_minutes=cooldown_minutes,
+                )
+                cooldown_wait_seconds = calculate_cooldown_wait_seconds(
+                    cooldown_minutes=cooldown_minutes,
+                    last_executed_at=last_executed_at,
+                )
+
+        held_by_this_run = issue_locked and bool(run_marker_label) and run_marker_label in issue.labels
+        if held_by_this_run or (cooldown_evaluated and cooldown_wait_seconds <= 0):
+            if held_by_this_run:
+                log(f"Lock already held by this run repo={repo} issue=#{issue_number} marker={run_marker_label}")
+            else:
+                log(
+                    "Acquiring lock "
+                    f"repo={repo} issue=#{issue_number} label={lock_label} "
+                    f"running={running_count}/{max_parallel}"
+                )
+                new_labels = [run_marker_label, lock_label] if run_marker_label else [lock_label]
+                try:
+                    add_issue_labels(repo, issue_number, new_labels)
+                    verify = get_issue(repo, issue_number)
+                    if lock_label not in verify.labels:
+                        raise RuntimeError("Lock label was not added.")
+                except RuntimeError:
+                    # ロック未取得のまま終わると解放処理が走らないため、作られた目印ラベルをここで消す。
+                    if run_marker_label:
+                        try:
+                            delete_label(repo, run_marker_label)
+                        except RuntimeError as err:
+                            log(f"WARNING: {err}")
+                    raise
 
             outputs = {
                 "lock_acquired": "true",
@@ -490,9 +838,12 @@ def acquire_lock(args: argparse.Namespace) -> int:
             running_count=running_count,
             max_parallel=max_parallel,
             cooldown_wait_seconds=cooldown_wait_seconds,
+            cooldown_evaluated=cooldown_evaluated,
         )
-        log(f"Waiting for lock: {reason_text}")
-        time.sleep(poll_seconds)
+        delay = calculate_poll_delay_seconds(attempt=poll_attempt, poll_seconds=poll_seconds)
+        poll_attempt += 1
+        log(f"Waiting for lock: {reason_text} (next check in {delay:.1f}s)")
+        time.sleep(delay)
 
 
 def release_lock(args: argparse.Namespace) -> int:
@@ -505,7 +856,8 @@ def release_lock(args: argparse.Namespace) -> int:
     service_label = str(args.service_label or "").strip()
     operation_label = str(args.operation_label or "").strip()
     if args.record_operation and service_label and operation_label:
-        executed_at = to_iso8601(dt.datetime.now(dt.timezone.utc))
+        executed_now = dt.datetime.now(dt.timezone.utc)
+        executed_at = to_iso8601(executed_now)
         marker = (
             f"<!-- {OPERATION_LOG_MARKER} "
             f"service={service_label} operation={operation_label} "
@@ -514,19 +866,33 @@ def release_lock(args: argparse.Namespace) -> int:
         body = marker + "\n\n_FlowSmith operation cooldown record._"
         run_gh(
             [
-                "issue",
-                "comment",
-                str(issue_number),
-                "--repo",
-                repo,
-                "--body",
-                body,
+                "api",
+                "-X",
+                "POST",
+                f"repos/{repo}/issues/{issue_number}/comments",
+                "-f",
+                f"body={body}",
             ]
         )
+        record_cooldown_cache(
+            repo=repo,
+            service_label=service_label,
+            operation_label=operation_label,
+            executed_at=executed_now,
+        )
         log(
             "Recorded operation cooldown marker "
             f"service={service_label} operation={operation_label} at={executed_at}"
         )
+
+    # run 単位の目印はラベル定義ごと削除し、リポジトリにラベルが溜まらないようにする。
+    # 後片付けに過ぎないため、失敗してもクールダウン記録を妨げないよう最後に警告だけで済ませる。
+    run_marker_label = build_run_marker_label(args.run_id)
+    if run_marker_label:
+        try:
+            delete_label(repo, run_marker_label)
+        except RuntimeError as err:
+            log(f"WARNING: {err}")
     return 0
 
 
@@ -546,6 +912,7 @@ def build_parser() -> argparse.ArgumentParser:
     acquire.add_argument("--service-label-prefix", default=DEFAULT_SERVICE_LABEL_PREFIX)
     acquire.add_argument("--operation-label-prefix", default=DEFAULT_OPERATION_LABEL_PREFIX)
     acquire.add_argument("--github-output", default=os.getenv("GITHUB_OUTPUT", ""))
+    acquire.add_argument("--run-id", default=os.getenv("GITHUB_RUN_ID", ""))
 
     release = subparsers.add_parser("release", help="Release issue lock")
     release.add_argument("--repo", required=True)
@@ -554,6 +921,7 @@ def build_parser() -> argparse.ArgumentParser:
     release.add_argument("--service-label", default="")
     release.add_argument("--operation-label", default="")
     release.add_argument("--record-operation", action="store_true")
+    release.add_argument("--run-id", default=os.getenv("GITHUB_RUN_ID", ""))
 
     return parser
 
@@ -3,23 +3,52 @@
 
 from __future__ import annotations
 
-import hashlib
+import functools
 import json
+import os
 import re
 import shlex
+import shutil
+import string
 import subprocess
-from copy import deepcopy
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Callable
+
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
+
+SLUG_DASH_RUN_PATTERN = re.compile(r"-{2,}")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+HTTPS_REPO_URL_PATTERN = re.compile(r"https?://[^/]+/([^/]+/[^/]+?)(?:\\.git)?/?$", flags=re.IGNORECASE)
+SSH_REPO_URL_PATTERN = re.compile(r"git@[^:]+:([^/]+/[^/]+?)(?:\\.git)?$")
+PLAIN_REPO_SLUG_PATTERN = re.compile(r"^[^/]+/[^/]+$")
+SHA256_CACHE_MAX_CHARS = 64_000
+INLINE_TEXT_CACHE_MAX_CHARS = 1024
+SPOOLED_OUTPUT_HEAD_BYTES = 64 * 1024
+CLIP_TEXT_SUFFIX = "\n...[truncated]"
 
 
 def read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def open_for_write(path: Path, mode: str = "w", **kwargs: Any) -> IO[Any]:
+    # 書き込み先ディレクトリ（run_dir など）はほぼ既に存在するため、毎回 mkdir せず
+    # まず開いてみて、親が無い場合だけ作成して開き直す。作成済みディレクトリを覚えておく
+    # 集合も不要で、親が在る通常時は mkdir / stat のシステムコールが発生しない。
+    try:
+        return open(path, mode, **kwargs)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return open(path, mode, **kwargs)
+
+
 def write_text(path: Path, content: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    with open_for_write(path, "w", encoding="utf-8") as handle:
+        handle.write(content)
 
 
 def parse_positive_int(value: Any, *, default: int, name: str) -> int:
@@ -45,16 +74,88 @@ def parse_string_list(value: Any, *, default: list[str], name: str) -> list[str]
     return result
 
 
-def sha256_text(content: str) -> str:
-    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+def _sha256_hexdigest(content: str | bytes) -> str:
+    # ハッシュは Entire 連携時にしか使わないため、hashlib の読み込みを初回呼び出しまで遅らせる。
+    import hashlib
+
+    return hashlib.sha256(encode_output(content)).hexdigest()
+
+
+@functools.lru_cache(maxsize=512)
+def _sha256_text_cached(content: str | bytes) -> str:
+    return _sha256_hexdigest(content)
+
+
+def sha256_text(content: str | bytes) -> str:
+    # ハッシュ値は Evidence SHA256 トレーラーや証跡 Markdown に「sha256」として公開され、
+    # sha256sum で照合される前提なので、高速な別アルゴリズムには置き換えない。
+    # 試行間で同じプロンプト・成果物を何度もハッシュするため小さい本文は結果を使い回す。
+    # 大きな本文はキャッシュに保持するとメモリを圧迫するので都度計算する。
+    # 書き出し用にエンコード済みの bytes を渡せば、同じ値を再エンコードせずに得られる。
+    if len(content) > SHA256_CACHE_MAX_CHARS:
+        return _sha256_hexdigest(content)
+    return _sha256_text_cached(content)
+
+
+def sha256_file(path: Path) -> str:
+    # sha256_text(read_text(path)) と同じ値になるよう、改行に \r を含まない限りはバイト列をそのまま
+    # ハッシュへ流し込み、UTF-8 のデコード・再エンコードを省く。\r を含む場合だけテキストモード
+    # （UTF-8・改行正規化）で 64 KiB ずつ読み直す。いずれもファイル全体を保持しない。
+    import hashlib
+
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            if b"\r" in chunk:
+                break
+            digest.update(chunk)
+        else:
+            return digest.hexdigest()
+
+    digest = hashlib.sha256()
+    with path.open("r", encoding="utf-8") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), ""):
+            digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_text_head_with_sha256(path: Path, *, max_chars: int) -> tuple[str, str]:
+    # ファイル全体のハッシュ（sha256_text(read_text(path)) と同値）を逐次計算しつつ、本文は
+    # 先頭の空白を除いた max_chars 文字と、その後に空白以外が続く場合の 1 文字だけを保持する。
+    # 戻り値の本文に strip → clip_text を適用すると、全文に適用した場合と同じ結果になる。
+    import hashlib
+
+    digest = hashlib.sha256()
+    parts: list[str] = []
+    kept = 0
+    overflow = ""
+    with path.open("r", encoding="utf-8") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), ""):
+            digest.update(chunk.encode("utf-8"))
+            if overflow:
+                continue
+            if kept == 0:
+                chunk = chunk.lstrip()
+            if kept < max_chars and chunk:
+                head = chunk[: max_chars - kept]
+                parts.append(head)
+                kept += len(head)
+                chunk = chunk[len(head):]
+            if chunk and not chunk.isspace():
+                overflow = chunk.lstrip()[:1]
+    return "".join(parts) + overflow, digest.hexdigest()
 
 
 def clip_text(content: str, *, max_chars: int) -> str:
+    # 切り詰めは文字数単位で行う。日本語を含む本文を UTF-8 のバイト列で切ると文字の途中で
+    # 分断されるため、bytes へは変換しない。切り詰め不要な本文はそのまま返し、コピーしない。
     if max_chars <= 0 or len(content) <= max_chars:
         return content
-    suffix = "\n...[truncated]"
-    end = max(max_chars - len(suffix), 0)
-    return content[:end].rstrip() + suffix
+    # 切り詰め位置から末尾の空白を遡ってから 1 回だけスライスし、中間文字列を作らない。
+    cut = max(max_chars - len(CLIP_TEXT_SUFFIX), 0)
+    while cut > 0 and content[cut - 1].isspace():
+        cut -= 1
+    return content[:cut] + CLIP_TEXT_SUFFIX
 
 
 def resolve_repo_relative_path(value: str, *, repo_root: Path, setting_name: str) -> Path:
@@ -77,13 +178,17 @@ def run_process(
     cwd: Path | None = None,
     check: bool = True,
     env: dict[str, str] | None = None,
-) -> subprocess.CompletedProcess[str]:
+    binary: bool = False,
+    input: str | bytes | None = None,
+) -> subprocess.CompletedProcess[Any]:
+    # binary=True では出力を bytes のまま返し、ログ書き出しまでデコードしない（input も bytes で渡す）。
     proc = subprocess.run(
         args,
         cwd=cwd,
-        text=True,
+        text=not binary,
         capture_output=True,
         env=env,
+        input=input,
         check=False,
     )
     if check and proc.returncode != 0:
@@ -91,36 +196,133 @@ def run_process(
         raise RuntimeError(
             f"Command failed: {joined}\n"
             f"exit={proc.returncode}\n"
-            f"stdout:\n{proc.stdout}\n"
-            f"stderr:\n{proc.stderr}"
+            f"stdout:\n{decode_output(proc.stdout)}\n"
+            f"stderr:\n{decode_output(proc.stderr)}"
         )
     return proc
 
 
+class SpooledProcessOutput:
+    """子プロセスの stdout/stderr をメモリではなく一時ファイルで受けた実行結果。"""
+
+    def __init__(self, args: list[str], returncode: int, stdout: IO[bytes], stderr: IO[bytes]) -> None:
+        self.args = args
+        self.returncode = returncode
+        self._stdout = stdout
+        self._stderr = stderr
+
+    def __enter__(self) -> "SpooledProcessOutput":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._stdout.close()
+        self._stderr.close()
+
+    def write_log(self, path: Path, *, title: str, command: str) -> None:
+        # write_process_log と同じ書式で、出力は一時ファイルからそのままログへ流し込む。
+        header = f"# {title}\n\n{command}\n\n# Exit Code\n\n{self.returncode}\n\n# Stdout\n\n"
+        with open_for_write(path, "wb") as handle:
+            handle.write(header.encode("utf-8"))
+            self._stdout.seek(0)
+            shutil.copyfileobj(self._stdout, handle)
+            handle.write(b"\n\n# Stderr\n\n")
+            self._stderr.seek(0)
+            shutil.copyfileobj(self._stderr, handle)
+            handle.write(b"\n")
+
+    def stdout_head(self, max_bytes: int = SPOOLED_OUTPUT_HEAD_BYTES) -> str:
+        self._stdout.seek(0)
+        return decode_output(self._stdout.read(max_bytes))
+
+    def stderr_head(self, max_bytes: int = SPOOLED_OUTPUT_HEAD_BYTES) -> str:
+        self._stderr.seek(0)
+        return decode_output(self._stderr.read(max_bytes))
+
+    def read_stdout(self) -> str:
+        self._stdout.seek(0)
+        return decode_output(self._stdout.read())
+
+
+def run_process_spooled(
+    args: list[str],
+    *,
+    cwd: Path | None = None,
+    env: dict[str, str] | None = None,
+    input: str | bytes | None = None,
+) -> SpooledProcessOutput:
+    # 出力の大きいエージェント・品質ゲート向け。子プロセスに一時ファイルを直接書かせるため、
+    # 出力量に関わらずメモリは増えず、ログへの書き出しもコピー 1 回で済む。
+    import tempfile
+
+    stdout_file = tempfile.TemporaryFile()
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(
+            args,
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.PIPE if input is not None else None,
+            stdout=stdout_file,
+            stderr=stderr_file,
+        )
+        proc.communicate(input=encode_output(input) if input is not None else None)
+    except BaseException:
+        stdout_file.close()
+        stderr_file.close()
+        raise
+    return SpooledProcessOutput(args, proc.returncode, stdout_file, stderr_file)
+
+
 def run_shell(
     command: str,
     *,
     cwd: Path | None = None,
     check: bool = True,
     env: dict[str, str] | None = None,
-) -> subprocess.CompletedProcess[str]:
-    return run_process(["bash", "-lc", command], cwd=cwd, check=check, env=env)
+    binary: bool = False,
+    input: str | bytes | None = None,
+) -> subprocess.CompletedProcess[Any]:
+    return run_process(["bash", "-lc", command], cwd=cwd, check=check, env=env, binary=binary, input=input)
 
 
 def format_command(args: list[str]) -> str:
     return " ".join(shlex.quote(arg) for arg in args)
 
 
-def write_command_log(path: Path, args: list[str], proc: subprocess.CompletedProcess[str]) -> None:
-    write_text(
-        path,
-        (
-            f"# Command\n\n{format_command(args)}\n\n"
-            f"# Exit Code\n\n{proc.returncode}\n\n"
-            f"# Stdout\n\n{proc.stdout}\n\n"
-            f"# Stderr\n\n{proc.stderr}\n"
-        ),
-    )
+def decode_output(value: str | bytes | None) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return value or ""
+
+
+def encode_output(value: str | bytes | None) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return (value or "").encode("utf-8")
+
+
+def write_process_log(path: Path, *, title: str, command: str, proc: subprocess.CompletedProcess[Any]) -> None:
+    # 出力が bytes の場合はデコードせずにそのまま書き出す。
+    header = f"# {title}\n\n{command}\n\n# Exit Code\n\n{proc.returncode}\n\n# Stdout\n\n"
+    with open_for_write(path, "wb") as handle:
+        handle.write(
+            b"".join(
+                [
+                    header.encode("utf-8"),
+                    encode_output(proc.stdout),
+                    b"\n\n# Stderr\n\n",
+                    encode_output(proc.stderr),
+                    b"\n",
+                ]
+            )
+        )
+
+
+def write_command_log(path: Path, args: list[str], proc: subprocess.CompletedProcess[Any]) -> None:
+    write_process_log(path, title="Command", command=format_command(args), proc=proc)
 
 
 def run_logged_process(
@@ -130,21 +332,137 @@ def run_logged_process(
     log_file: Path,
     check: bool,
     error_message: str,
-) -> subprocess.CompletedProcess[str]:
-    proc = run_process(args, cwd=cwd, check=False)
-    write_command_log(log_file, args, proc)
-    if check and proc.returncode != 0:
+) -> subprocess.CompletedProcess[Any]:
+    # 呼び出し側は終了コードだけを見るため、出力はメモリに載せずログファイルにだけ残す。
+    with run_process_spooled(args, cwd=cwd) as spooled:
+        spooled.write_log(log_file, title="Command", command=format_command(args))
+    if check and spooled.returncode != 0:
         raise RuntimeError(f"{error_message} See {log_file} for details.")
-    return proc
+    return subprocess.CompletedProcess(args, spooled.returncode, stdout=b"", stderr=b"")
 
 
 def git(args: list[str], *, cwd: Path, check: bool = True) -> subprocess.CompletedProcess[str]:
     return run_process(["git", *args], cwd=cwd, check=check)
 
 
+class GitCatFileBatch:
+    """`git cat-file --batch-check` を常駐させ、オブジェクト名の解決を 1 プロセスで捌く。
+
+    プロセスは最初の問い合わせ時に起動するため、問い合わせが無ければ git は起動しない。
+    """
+
+    def __init__(self, repo_root: Path) -> None:
+        self._repo_root = repo_root
+        self._proc: subprocess.Popen[str] | None = None
+
+    def __enter__(self) -> "GitCatFileBatch":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        proc = self._proc
+        if proc is None:
+            return
+        self._proc = None
+        if proc.stdin is not None:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        if proc.stdout is not None:
+            proc.stdout.close()
+
+    def resolve(self, object_name: str) -> str:
+        # 見つからない名前は空文字を返す（rev-parse --verify --quiet 相当）。
+        # 改行を含む名前は batch 入力を壊すため、存在しない扱いにする。
+        if "\n" in object_name:
+            return ""
+        if self._proc is None:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                cwd=self._repo_root,
+                text=True,
+            )
+        proc = self._proc
+        if proc.stdin is None or proc.stdout is None:
+            return ""
+        try:
+            proc.stdin.write(object_name + "\n")
+            proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return ""
+        response = proc.stdout.readline().rstrip("\n")
+        if not response or response.endswith(" missing") or response.endswith(" ambiguous"):
+            return ""
+        return response.split(" ", 1)[0]
+
+    def exists(self, object_name: str) -> bool:
+        return bool(self.resolve(object_name))
+
+
+def git_add_pathspecs(paths: list[str], *, cwd: Path, force: bool = False) -> None:
+    # パス数が多くてもコマンドライン長の上限（Windows は約 32K 文字）に当たらず 1 回の git add で
+    # 済むよう、pathspec は NUL 区切りで stdin から渡す（git 2.25 以降）。
+    if not paths:
+        return
+    args = ["git", "add"]
+    if force:
+        args.append("-f")
+    args.extend(["--pathspec-from-file=-", "--pathspec-file-nul"])
+    run_process(args, cwd=cwd, binary=True, input=b"\x00".join(os.fsencode(path) for path in paths))
+
+
+TEMPLATE_CONVERTERS: dict[str, Callable[[Any], str]] = {"r": repr, "s": str, "a": ascii}
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_template(template: str) -> tuple[tuple[str, str | None, str, str | None], ...] | None:
+    # 同じテンプレートは試行・ステップごとに何度も描画されるため、解析結果を使い回す。
+    # 属性/添字参照やネストした書式指定を含むものは None を返し、format_map に任せる。
+    try:
+        parts = tuple(string.Formatter().parse(template))
+    except ValueError:
+        return None
+    for _, field_name, format_spec, conversion in parts:
+        if field_name is None:
+            continue
+        if not field_name.isidentifier() or "{" in (format_spec or ""):
+            return None
+        if conversion is not None and conversion not in TEMPLATE_CONVERTERS:
+            return None
+    return parts
+
+
 def format_template(template: str, context: dict[str, Any], template_name: str) -> str:
+    # context はステップごとに数十キーへ育つため、**context の辞書コピーを避けて直接参照する。
+    parts = _compile_template(template)
     try:
-        return template.format(**context)
+        if parts is None:
+            return template.format_map(context)
+        pieces: list[str] = []
+        for literal, field_name, format_spec, conversion in parts:
+            if literal:
+                pieces.append(literal)
+            if field_name is None:
+                continue
+            value = context[field_name]
+            if conversion:
+                value = TEMPLATE_CONVERTERS[conversion](value)
+            # 書式指定の無い文字列（パス・ブランチ名など大半の値）は format を通さずそのまま連結する。
+            if format_spec or type(value) is not str:
+                value = format(value, format_spec or "")
+            pieces.append(value)
+        return "".join(pieces)
     except KeyError as err:
         missing = err.args[0]
         raise RuntimeError(
@@ -152,8 +470,25 @@ def format_template(template: str, context: dict[str, Any], template_name: str)
         ) from err
 
 
+class _SlugTranslationTable(dict):
+    """str.translate table that maps every character outside [a-z0-9] to '-'."""
+
+    def __missing__(self, codepoint: int) -> str:
+        return "-"
+
+
+SLUG_TRANSLATION_TABLE = _SlugTranslationTable(
+    {ord(char): char for char in string.ascii_lowercase + string.digits}
+)
+
+
+@functools.lru_cache(maxsize=256)
 def slugify(text: str, max_len: int = 40) -> str:
-    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    # project_id / repo_slug / issue タイトルは 1 回の実行で同じ値が繰り返し渡されるため結果を使い回す。
+    slug = text.lower().translate(SLUG_TRANSLATION_TABLE)
+    if "--" in slug:
+        slug = SLUG_DASH_RUN_PATTERN.sub("-", slug)
+    slug = slug.strip("-")
     return (slug[:max_len].strip("-")) or "task"
 
 
@@ -165,24 +500,44 @@ def resolve_path(value: str | Path, *, base_dir: Path) -> Path:
 
 
 def merge_dict(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
-    merged = deepcopy(base)
+    # 上書きで通る辞書の骨格と上書き側のリストだけを新しく作り、文字列・数値などの葉は共有する。
+    # 設定は読み込み後に変更されないため、深いコピーは不要。
+    merged = dict(base)
     for key, value in override.items():
         if isinstance(value, dict) and isinstance(merged.get(key), dict):
             merged[key] = merge_dict(merged[key], value)
             continue
-        merged[key] = deepcopy(value)
+        merged[key] = list(value) if isinstance(value, list) else value
     return merged
 
 
+@functools.lru_cache(maxsize=65536)
 def normalize_repo_path(path_value: str) -> str:
+    # コミット時には同じパスを ignore/required 判定などで何度も正規化するため、結果を使い回す。
     normalized = Path(path_value).as_posix()
     if normalized.startswith("./"):
         return normalized[2:]
     return normalized
 
 
+@functools.lru_cache(maxsize=4096)
+def _normalize_inline_text_cached(value: str) -> str:
+    return WHITESPACE_PATTERN.sub(" ", value).strip()
+
+
 def normalize_inline_text(value: str) -> str:
-    return re.sub(r"\s+", " ", value).strip()
+    # 要約生成では見出しや定型文など同じ短い文字列が繰り返し渡されるため、短いものだけ結果を使い回す。
+    if len(value) > INLINE_TEXT_CACHE_MAX_CHARS:
+        return WHITESPACE_PATTERN.sub(" ", value).strip()
+    return _normalize_inline_text_cached(value)
+
+
+def render_status_markdown(headline: str, fields: dict[str, Any]) -> str:
+    # run_dir に残す *_status.md の共通形式（見出し行 + `- key: `value`` 行）を 1 回の join で組み立てる。
+    lines = [f"- {headline}"]
+    lines.extend(f"- {key}: `{value}`" for key, value in fields.items())
+    lines.append("")
+    return "\n".join(lines)
 
 
 def clip_inline_text(value: str, *, max_chars: int) -> str:
@@ -194,35 +549,42 @@ def clip_inline_text(value: str, *, max_chars: int) -> str:
     return normalized[:end].rstrip() + suffix
 
 
+@functools.lru_cache(maxsize=256)
 def normalize_repo_slug(raw: str) -> str:
     value = raw.strip()
     if not value:
         return ""
 
-    https_match = re.match(
-        r"https?://[^/]+/([^/]+/[^/]+?)(?:\\.git)?/?$",
-        value,
-        flags=re.IGNORECASE,
-    )
+    https_match = HTTPS_REPO_URL_PATTERN.match(value)
     if https_match:
         return https_match.group(1)
 
-    ssh_match = re.match(r"git@[^:]+:([^/]+/[^/]+?)(?:\\.git)?$", value)
+    ssh_match = SSH_REPO_URL_PATTERN.match(value)
     if ssh_match:
         return ssh_match.group(1)
 
-    plain_match = re.match(r"^[^/]+/[^/]+$", value)
+    plain_match = PLAIN_REPO_SLUG_PATTERN.match(value)
     if plain_match:
         return value.removesuffix(".git")
 
     return value.removesuffix(".git")
 
 
+_DETECTED_REPO_SLUGS: dict[Path, str] = {}
+
+
 def detect_repo_slug(repo_root: Path) -> str:
+    # origin が解決できた場合だけ覚えておき、同じリポジトリで git を再起動しない。
+    cached = _DETECTED_REPO_SLUGS.get(repo_root)
+    if cached:
+        return cached
     remote = git(["remote", "get-url", "origin"], cwd=repo_root, check=False)
     if remote.returncode != 0:
         return ""
-    return normalize_repo_slug(remote.stdout.strip())
+    slug = normalize_repo_slug(remote.stdout.strip())
+    if slug:
+        _DETECTED_REPO_SLUGS[repo_root] = slug
+    return slug
 
 
 def require_clean_worktree(repo_root: Path) -> None:
@@ -240,9 +602,17 @@ def validate_config(data: dict[str, Any], config_path: Path) -> None:
         raise RuntimeError(f"Config is invalid ({config_path}): missing 'templates'.")
 
 
+def loads_json(data: str | bytes) -> Any:
+    # orjson が入っていれば bytes から直接パースする。orjson.JSONDecodeError は
+    # json.JSONDecodeError のサブクラスなので、呼び出し側の例外処理はそのまま使える。
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def load_json(path: Path) -> dict[str, Any]:
     try:
-        payload = json.loads(read_text(path))
+        payload = loads_json(path.read_bytes())
     except FileNotFoundError as err:
         raise RuntimeError(f"JSON file not found: {path}") from err
     except json.JSONDecodeError as err:
@@ -3,12 +3,24 @@
 
 from __future__ import annotations
 
+import functools
+import os
 import re
 import sys
 from pathlib import Path
 from typing import Any, Callable
 
 
+ATTEMPT_FILE_PATTERN = re.compile(r"(.*)_attempt_(\d+)\.md")
+TRACE_SECTION_WORKERS = 8
+ENTIRE_TRAILER_PATTERN = re.compile(r"(?mi)^(Entire-[A-Za-z0-9-]+):\s*(.+)$")
+
+
+@functools.lru_cache(maxsize=32)
+def _trailer_pattern(trailer_key: str) -> re.Pattern[str]:
+    return re.compile(rf"(?mi)^{re.escape(trailer_key)}:\s*(.+)$")
+
+
 class PipelineEntireService:
     """Encapsulates Entire CLI integration and explicit trace handling."""
 
@@ -23,7 +35,11 @@ class PipelineEntireService:
         run_logged_process: Callable[..., Any],
         read_text: Callable[[Path], str],
         write_text: Callable[[Path, str], None],
-        sha256_text: Callable[[str], str],
+        render_status_markdown: Callable[[str, dict[str, Any]], str],
+        sha256_text: Callable[[str | bytes], str],
+        sha256_file: Callable[[Path], str],
+        read_text_head_with_sha256: Callable[..., tuple[str, str]],
+        git_cat_file_batch: Callable[[Path], Any],
         clip_text: Callable[..., str],
         git: Callable[..., Any],
         log: Callable[[str], None],
@@ -36,28 +52,51 @@ class PipelineEntireService:
         self._run_logged_process = run_logged_process
         self._read_text = read_text
         self._write_text = write_text
+        self._render_status_markdown = render_status_markdown
         self._sha256_text = sha256_text
+        self._sha256_file = sha256_file
+        self._read_text_head_with_sha256 = read_text_head_with_sha256
+        self._git_cat_file_batch = git_cat_file_batch
         self._clip_text = clip_text
         self._git = git
         self._log = log
+        # 同一プロセス内で書き出した証跡の (sha256, mtime_ns, size)。検証時の再読込を省くために使う。
+        self._written_artifact_hashes: dict[Path, tuple[str, int, int]] = {}
+        # 証跡セクションごとの (mtime_ns, size, max_chars, 先頭本文, sha256)。未変更のファイルは読み直さない。
+        self._trace_file_heads: dict[Path, tuple[int, int, int, str, str]] = {}
 
     @staticmethod
     def extract_attempt_index(file_name: str) -> int:
-        match = re.search(r"_attempt_(\d+)\.md$", file_name)
+        match = ATTEMPT_FILE_PATTERN.fullmatch(file_name)
         if not match:
             return sys.maxsize
-        return int(match.group(1))
+        return int(match.group(2))
 
     @staticmethod
     def extract_commit_trailer(commit_message: str, trailer_key: str) -> str:
-        pattern = re.compile(rf"(?mi)^{re.escape(trailer_key)}:\s*(.+)$")
-        match = pattern.search(commit_message)
+        match = _trailer_pattern(trailer_key).search(commit_message)
         if not match:
             return ""
         return match.group(1).strip()
 
+    @staticmethod
+    def parse_entire_trailers(commit_message: str) -> dict[str, str]:
+        # Entire-* トレーラーを 1 回の走査でまとめて取り出す。キーは小文字に揃え、
+        # extract_commit_trailer と同じく同名が複数あれば最初のものを採用する。
+        trailers: dict[str, str] = {}
+        for match in ENTIRE_TRAILER_PATTERN.finditer(commit_message):
+            trailers.setdefault(match.group(1).lower(), match.group(2).strip())
+        return trailers
+
+    def get_head_commit_info(self, repo_root: Path) -> tuple[str, str]:
+        # SHA と本文を 1 回の git 呼び出しで取得する。HEAD は後続のコミットで動くため、
+        # 結果は保持せず、必要な呼び出し元へ引数で渡す。
+        output = self._git(["log", "-1", "--format=%H%x00%B"], cwd=repo_root).stdout
+        sha, _, message = output.partition("\x00")
+        return sha.strip(), message
+
     def get_head_commit_message(self, repo_root: Path) -> str:
-        return self._git(["log", "-1", "--pretty=%B"], cwd=repo_root).stdout
+        return self.get_head_commit_info(repo_root)[1]
 
     def setup_entire_trace(
         self,
@@ -139,14 +178,36 @@ class PipelineEntireService:
             }
 
         command_parts = self._split_command(resolved_command, name="entire.command")
+        strategy = str(entire_conf_raw.get("strategy", "manual-commit")).strip() or "manual-commit"
+        scope = str(entire_conf_raw.get("scope", "project")).strip().lower() or "project"
+        agent = str(entire_conf_raw.get("agent", "codex")).strip() or "codex"
+
         version_log = run_dir / "entire_version.log"
-        version_proc = self._run_logged_process(
-            [*command_parts, "version"],
-            cwd=repo_root,
-            log_file=version_log,
-            check=False,
-            error_message="Entire バージョン確認に失敗しました。",
-        )
+        strategy_log = run_dir / "entire_strategy.log"
+        # version と strategy set は互いに依存しないため、CLI の起動待ちが直列に積み重ならないよう
+        # 並列に実行する。結果の判定順（version → strategy）は従来どおり。
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            version_future = executor.submit(
+                self._run_logged_process,
+                [*command_parts, "version"],
+                cwd=repo_root,
+                log_file=version_log,
+                check=False,
+                error_message="Entire バージョン確認に失敗しました。",
+            )
+            strategy_future = executor.submit(
+                self._run_logged_process,
+                [*command_parts, "strategy", "set", strategy],
+                cwd=repo_root,
+                log_file=strategy_log,
+                check=False,
+                error_message="Entire strategy 設定に失敗しました。",
+            )
+            version_proc = version_future.result()
+            strategy_proc = strategy_future.result()
+
         if version_proc.returncode != 0:
             message = "Entire CLI が利用できないため、証跡連携をスキップします。"
             if required:
@@ -160,18 +221,6 @@ class PipelineEntireService:
                 "entire_setup_log": str(version_log),
             }
 
-        strategy = str(entire_conf_raw.get("strategy", "manual-commit")).strip() or "manual-commit"
-        scope = str(entire_conf_raw.get("scope", "project")).strip().lower() or "project"
-        agent = str(entire_conf_raw.get("agent", "codex")).strip() or "codex"
-
-        strategy_log = run_dir / "entire_strategy.log"
-        strategy_proc = self._run_logged_process(
-            [*command_parts, "strategy", "set", strategy],
-            cwd=repo_root,
-            log_file=strategy_log,
-            check=False,
-            error_message="Entire strategy 設定に失敗しました。",
-        )
         if strategy_proc.returncode != 0 and required:
             raise RuntimeError(f"Entire strategy 設定に失敗しました。See {strategy_log} for details.")
 
@@ -211,16 +260,18 @@ class PipelineEntireService:
 
         self._write_text(
             run_dir / "entire_status.md",
-            (
-                "- Entire 連携を有効化しました。\n"
-                f"- command: `{resolved_command}`\n"
-                f"- agent: `{agent}`\n"
-                f"- strategy: `{strategy}`\n"
-                f"- trailer_key: `{trailer_key}`\n"
-                f"- explicit_registration.enabled: `{explicit_enabled}`\n"
-                f"- explicit_registration.artifact_path: `{explicit_artifact_path}`\n"
-                f"- explicit_registration.append_commit_trailers: `{explicit_append_trailers}`\n"
-                f"- explicit_registration.generate_explain: `{explicit_generate_explain}`\n"
+            self._render_status_markdown(
+                "Entire 連携を有効化しました。",
+                {
+                    "command": resolved_command,
+                    "agent": agent,
+                    "strategy": strategy,
+                    "trailer_key": trailer_key,
+                    "explicit_registration.enabled": explicit_enabled,
+                    "explicit_registration.artifact_path": explicit_artifact_path,
+                    "explicit_registration.append_commit_trailers": explicit_append_trailers,
+                    "explicit_registration.generate_explain": explicit_generate_explain,
+                },
             ),
         )
         return {
@@ -232,29 +283,47 @@ class PipelineEntireService:
             "entire_setup_log": str(enable_log),
         }
 
+    def _read_trace_file_head(self, path: Path, *, max_chars: int) -> tuple[str, str]:
+        # 大きなログでも全文を保持しないよう、ハッシュは逐次計算し本文は切り詰めに必要な先頭だけ読む。
+        # mtime と size が変わっていなければ前回の結果を使い、同じファイルを何度もハッシュしない。
+        try:
+            stat = path.stat()
+        except OSError:
+            stat = None
+        cached = self._trace_file_heads.get(path)
+        if stat is not None and cached is not None:
+            mtime_ns, size, cached_max_chars, head_text, digest = cached
+            if (mtime_ns, size, cached_max_chars) == (stat.st_mtime_ns, stat.st_size, max_chars):
+                return head_text, digest
+        head_text, digest = self._read_text_head_with_sha256(path, max_chars=max_chars)
+        if stat is not None:
+            self._trace_file_heads[path] = (stat.st_mtime_ns, stat.st_size, max_chars, head_text, digest)
+        return head_text, digest
+
     def _render_trace_file_section(
         self,
         *,
         title: str,
         path: Path,
         max_chars: int,
-    ) -> str:
-        lines = [f"### {title}", f"- source: `{path.name}`"]
+    ) -> list[str]:
+        # 呼び出し側の行リストへそのまま extend できるよう、結合せずに行単位で返す。
         if not path.exists():
-            lines.append("- status: missing")
-            lines.append("")
-            return "\n".join(lines)
-
-        raw_text = self._read_text(path)
-        digest = self._sha256_text(raw_text)
-        clipped = self._clip_text(raw_text.strip(), max_chars=max_chars).strip()
-        lines.append(f"- sha256: `{digest}`")
-        lines.append("")
-        lines.append("~~~text")
-        lines.append(clipped or "(empty)")
-        lines.append("~~~")
-        lines.append("")
-        return "\n".join(lines)
+            return [f"### {title}", f"- source: `{path.name}`", "- status: missing", ""]
+
+        head_text, digest = self._read_trace_file_head(path, max_chars=max_chars)
+        # max_chars が省略記号より短いと clip_text は改行始まりの省略記号だけを返すため、結果も strip する。
+        clipped = self._clip_text(head_text.strip(), max_chars=max_chars).strip()
+        return [
+            f"### {title}",
+            f"- source: `{path.name}`",
+            f"- sha256: `{digest}`",
+            "",
+            "~~~text",
+            clipped or "(empty)",
+            "~~~",
+            "",
+        ]
 
     def _build_entire_registration_markdown(
         self,
@@ -262,22 +331,27 @@ class PipelineEntireService:
         run_dir: Path,
         context: dict[str, Any],
         max_chars: int,
-    ) -> tuple[str, int]:
+    ) -> tuple[bytes, int]:
+        # run_dir を 1 回だけ走査し、試行番号の抽出とプロンプトファイルの振り分けを同時に行う。
+        coder_prompts: list[tuple[int, str]] = []
+        attempt_numbers: set[int] = set()
+        try:
+            with os.scandir(run_dir) as entries:
+                for entry in entries:
+                    match = ATTEMPT_FILE_PATTERN.fullmatch(entry.name)
+                    if not match:
+                        continue
+                    index = int(match.group(2))
+                    attempt_numbers.add(index)
+                    if match.group(1) == "coder_prompt":
+                        coder_prompts.append((index, entry.name))
+        except FileNotFoundError:
+            pass
+
         prompt_paths = [run_dir / "planner_prompt.md"]
-        prompt_paths.extend(
-            sorted(
-                run_dir.glob("coder_prompt_attempt_*.md"),
-                key=lambda item: self.extract_attempt_index(item.name),
-            )
-        )
+        prompt_paths.extend(run_dir / name for _, name in sorted(coder_prompts))
         prompt_paths.append(run_dir / "reviewer_prompt.md")
 
-        attempt_numbers: set[int] = set()
-        for path in run_dir.glob("*_attempt_*.md"):
-            index = self.extract_attempt_index(path.name)
-            if index != sys.maxsize:
-                attempt_numbers.add(index)
-
         lines: list[str] = [
             "# Entire 証跡登録",
             "",
@@ -292,36 +366,88 @@ class PipelineEntireService:
             "## 1. 指示したプロンプト",
             "",
         ]
-        for path in prompt_paths:
-            title = path.name
-            lines.append(self._render_trace_file_section(title=title, path=path, max_chars=max_chars))
+        sorted_attempts = sorted(attempt_numbers)
+        plan_file = Path(str(context.get("plan_file", run_dir / "plan.md")))
+        review_file = Path(str(context.get("review_file", run_dir / "review.md")))
+        section_paths = list(prompt_paths)
+        for attempt in sorted_attempts:
+            section_paths.append(run_dir / f"coder_output_attempt_{attempt}.md")
+            section_paths.append(run_dir / f"validation_attempt_{attempt}.md")
+        section_paths.extend([plan_file, review_file])
+
+        def render(path: Path) -> list[str]:
+            return self._render_trace_file_section(title=path.name, path=path, max_chars=max_chars)
+
+        # 各セクションの読み込み・ハッシュ計算は互いに独立で I/O 待ちが主なので、スレッドで並行させる。
+        # executor.map は投入順に結果を返すため、出力の並びは逐次実行と変わらない。
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(TRACE_SECTION_WORKERS, len(section_paths))) as executor:
+            rendered = iter(list(executor.map(render, section_paths)))
+
+        for _ in prompt_paths:
+            lines.extend(next(rendered))
 
         lines.extend(["## 2. 試行錯誤", ""])
-        for attempt in sorted(attempt_numbers):
+        for attempt in sorted_attempts:
             lines.append(f"### attempt {attempt}")
-            lines.append(
-                self._render_trace_file_section(
-                    title=f"coder_output_attempt_{attempt}.md",
-                    path=run_dir / f"coder_output_attempt_{attempt}.md",
-                    max_chars=max_chars,
-                )
-            )
-            lines.append(
-                self._render_trace_file_section(
-                    title=f"validation_attempt_{attempt}.md",
-                    path=run_dir / f"validation_attempt_{attempt}.md",
-                    max_chars=max_chars,
-                )
-            )
+            lines.extend(next(rendered))
+            lines.extend(next(rendered))
 
         lines.extend(["## 3. 設計根拠", ""])
-        plan_file = Path(str(context.get("plan_file", run_dir / "plan.md")))
-        review_file = Path(str(context.get("review_file", run_dir / "review.md")))
-        lines.append(self._render_trace_file_section(title=plan_file.name, path=plan_file, max_chars=max_chars))
-        lines.append(self._render_trace_file_section(title=review_file.name, path=review_file, max_chars=max_chars))
+        lines.extend(next(rendered))
+        lines.extend(next(rendered))
 
-        content = "\n".join(lines).strip() + "\n"
-        return content, len(attempt_numbers)
+        # 先頭は見出し、末尾は各セクション末尾の空行なので、結合結果はそのまま 1 つの改行で終わる。
+        # strip や末尾改行の付け足しによる全体の複製を避け、ハッシュと書き出しで共有する bytes を返す。
+        return "\n".join(lines).encode("utf-8"), len(attempt_numbers)
+
+    @staticmethod
+    def _write_registration_bundle(encoded: bytes, *, bundle_path: Path, artifact_path: Path) -> None:
+        # 同じ内容を 2 箇所に置くため、バッファを介さず一括で書き込む。
+        # 証跡は一時ファイルへ書いてから os.replace で差し替え、途中状態が見えないようにする。
+        artifact_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = artifact_path.with_name(f".{artifact_path.name}.tmp")
+        try:
+            with temp_path.open("wb", buffering=0) as handle:
+                handle.write(encoded)
+            os.replace(temp_path, artifact_path)
+        except OSError:
+            # 一時ファイルが残ると後続の git add -A でコミットされてしまうため必ず消す。
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        bundle_path.parent.mkdir(parents=True, exist_ok=True)
+        # 同一ファイルシステム上ならハードリンクで 2 回目の書き込みを省き、
+        # 別ファイルシステムなどでリンクできない場合だけ再度書き込む。
+        try:
+            bundle_path.unlink(missing_ok=True)
+            os.link(artifact_path, bundle_path)
+            return
+        except OSError:
+            pass
+        with bundle_path.open("wb", buffering=0) as handle:
+            handle.write(encoded)
+
+    def _remember_artifact_hash(self, path: Path, digest: str) -> None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        self._written_artifact_hashes[path] = (digest, stat.st_mtime_ns, stat.st_size)
+
+    def _artifact_hash(self, path: Path) -> str:
+        # 書き出し後にファイルが変わっていなければ生成時のハッシュを使い、変わっていれば読み直す。
+        cached = self._written_artifact_hashes.get(path)
+        if cached is not None:
+            digest, mtime_ns, size = cached
+            try:
+                stat = path.stat()
+            except OSError:
+                stat = None
+            if stat is not None and stat.st_mtime_ns == mtime_ns and stat.st_size == size:
+                return digest
+        return self._sha256_file(path)
 
     def prepare_entire_explicit_registration(
         self,
@@ -329,6 +455,7 @@ class PipelineEntireService:
         repo_root: Path,
         run_dir: Path,
         context: dict[str, Any],
+        commit_message: str | None = None,
     ) -> dict[str, Any]:
         explicit_enabled = bool(context.get("entire_explicit_enabled"))
         explicit_required = bool(context.get("entire_explicit_required"))
@@ -389,8 +516,12 @@ class PipelineEntireService:
             self._write_text(run_dir / "entire_registration_status.md", f"- {message}\n")
             return default_state
 
-        self._write_text(run_dir / "entire_registration_bundle.md", artifact_content)
-        self._write_text(artifact_path, artifact_content)
+        self._write_registration_bundle(
+            artifact_content,
+            bundle_path=run_dir / "entire_registration_bundle.md",
+            artifact_path=artifact_path,
+        )
+        self._remember_artifact_hash(artifact_path, artifact_sha)
 
         commit_appendix = ""
         if append_trailers:
@@ -406,12 +537,14 @@ class PipelineEntireService:
 
         self._write_text(
             run_dir / "entire_registration_status.md",
-            (
-                "- 明示登録バンドルを生成しました。\n"
-                f"- artifact: `{artifact_relative_path}`\n"
-                f"- sha256: `{artifact_sha}`\n"
-                f"- attempts: `{attempt_count}`\n"
-                f"- append_commit_trailers: `{append_trailers}`\n"
+            self._render_status_markdown(
+                "明示登録バンドルを生成しました。",
+                {
+                    "artifact": artifact_relative_path,
+                    "sha256": artifact_sha,
+                    "attempts": attempt_count,
+                    "append_commit_trailers": append_trailers,
+                },
             ),
         )
         return {
@@ -429,6 +562,7 @@ class PipelineEntireService:
         repo_root: Path,
         run_dir: Path,
         context: dict[str, Any],
+        commit_message: str | None = None,
     ) -> dict[str, Any]:
         explicit_enabled = bool(context.get("entire_explicit_enabled"))
         explicit_required = bool(context.get("entire_explicit_required"))
@@ -443,13 +577,15 @@ class PipelineEntireService:
 
         checks: list[str] = []
         errors: list[str] = []
-        commit_message = self.get_head_commit_message(repo_root)
+        if commit_message is None:
+            _, commit_message = self.get_head_commit_info(repo_root)
 
         trace_file = str(context.get("entire_trace_file", "")).strip()
         trace_hash = str(context.get("entire_trace_sha256", "")).strip()
         if append_trailers:
-            trailer_file = self.extract_commit_trailer(commit_message, "Entire-Trace-File")
-            trailer_hash = self.extract_commit_trailer(commit_message, "Entire-Trace-SHA256")
+            trailers = self.parse_entire_trailers(commit_message)
+            trailer_file = trailers.get("entire-trace-file", "")
+            trailer_hash = trailers.get("entire-trace-sha256", "")
             checks.append(f"- trailer_file: `{trailer_file or '未検出'}`")
             checks.append(f"- trailer_hash: `{trailer_hash or '未検出'}`")
             if not trailer_file:
@@ -480,16 +616,10 @@ class PipelineEntireService:
                 if not trace_path.exists():
                     errors.append(f"証跡ファイルが見つかりません: {trace_file}")
                 else:
-                    actual_hash = self._sha256_text(self._read_text(trace_path))
+                    actual_hash = self._artifact_hash(trace_path)
                     checks.append(f"- artifact_hash: `{actual_hash}`")
-                    in_head = (
-                        self._git(
-                            ["cat-file", "-e", f"HEAD:{trace_file}"],
-                            cwd=repo_root,
-                            check=False,
-                        ).returncode
-                        == 0
-                    )
+                    with self._git_cat_file_batch(repo_root) as batch:
+                        in_head = batch.exists(f"HEAD:{trace_file}")
                     checks.append(f"- artifact_in_head: `{'yes' if in_head else 'no'}`")
                     if not in_head:
                         errors.append(f"証跡ファイルが HEAD コミットに含まれていません: {trace_file}")
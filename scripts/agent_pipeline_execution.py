@@ -49,6 +49,7 @@ def run_pipeline(
     run_agent_command = _dep(deps, "run_agent_command")
     read_text = _dep(deps, "read_text")
     run_quality_gates = _dep(deps, "run_quality_gates")
+    parse_quality_gates = _dep(deps, "parse_quality_gates")
     clip_text = _dep(deps, "clip_text")
     build_codex_commit_summary = _dep(deps, "build_codex_commit_summary")
     prepare_entire_explicit_registration = _dep(deps, "prepare_entire_explicit_registration")
@@ -60,8 +61,7 @@ def run_pipeline(
     build_commit_message = _dep(deps, "build_commit_message")
     commit_changes = _dep(deps, "commit_changes")
     is_no_change_runtime_error = _dep(deps, "is_no_change_runtime_error")
-    get_head_commit_sha = _dep(deps, "get_head_commit_sha")
-    get_head_commit_message = _dep(deps, "get_head_commit_message")
+    get_head_commit_info = _dep(deps, "get_head_commit_info")
     extract_commit_trailer = _dep(deps, "extract_commit_trailer")
     verify_entire_explicit_registration = _dep(deps, "verify_entire_explicit_registration")
     generate_entire_explain = _dep(deps, "generate_entire_explain")
@@ -86,7 +86,9 @@ def run_pipeline(
     project_id = runtime["project_id"]
     repo_slug = runtime["repo_slug"]
     
-    require_clean_worktree(target_repo_root)
+    # clone 直後の作業ツリーはクリーンなことが分かっているため、git status を省く。
+    if not runtime.get("target_freshly_cloned"):
+        require_clean_worktree(target_repo_root)
     
     issue = (
         load_issue_from_file(args.issue_file, args.issue_number)
@@ -127,7 +129,15 @@ def run_pipeline(
         or f"agent/{branch_prefix}issue-{issue['number']}-{slugify(issue['title'])}"
     )
     max_attempts = int(config.get("max_attempts", 3))
-    quality_gates = config.get("quality_gates", [])
+    quality_gate_specs = parse_quality_gates(config.get("quality_gates", []))
+    quality_gates = [command for command, _ in quality_gate_specs]
+    save_prompt_files = bool(config.get("save_prompt_files", True))
+    quality_gate_concurrency = parse_positive_int(
+        config.get("quality_gate_concurrency", 1),
+        default=1,
+        name="quality_gate_concurrency",
+    )
+    quality_gate_fail_fast = bool(config.get("quality_gate_fail_fast", False))
     quality_gate_list = "\n".join(f"- `{item}`" for item in quality_gates) or "- (none)"
     
     timestamp = dt.datetime.now(dt.UTC).strftime("%Y%m%dT%H%M%SZ")
@@ -312,6 +322,7 @@ def run_pipeline(
         base_branch,
         branch_name,
         sync_base=not args.no_sync,
+        fast_sync=bool(config.get("fast_sync", True)),
     )
     
     entire_state = setup_entire_trace(
@@ -335,8 +346,6 @@ def run_pipeline(
     planner_prompt = run_dir / "planner_prompt.md"
     planner_output = run_dir / "planner_output.md"
     context["output_file"] = str(planner_output)
-    write_text(planner_prompt, render_template_file(planner_template, context))
-    
     run_agent_command(
         step_name="planner",
         command_template=planner_cmd,
@@ -347,12 +356,15 @@ def run_pipeline(
         },
         repo_root=target_repo_root,
         prompt_file=planner_prompt,
+        prompt_text=render_template_file(planner_template, context),
+        save_prompt_file=save_prompt_files,
         output_file=planner_output,
         log_file=run_dir / "planner_command.log",
         required_output=True,
     )
-    write_text(plan_file, read_text(planner_output))
-    context["plan_markdown"] = read_text(plan_file)
+    planner_text = read_text(planner_output)
+    write_text(plan_file, planner_text)
+    context["plan_markdown"] = planner_text
     
     last_validation = ""
     external_feedback_text = clip_text(
@@ -369,7 +381,6 @@ def run_pipeline(
         coder_output = run_dir / f"coder_output_attempt_{attempt}.md"
         context["output_file"] = str(coder_output)
     
-        write_text(coder_prompt, render_template_file(coder_template, context))
         run_agent_command(
             step_name=f"coder-attempt-{attempt}",
             command_template=coder_cmd,
@@ -380,6 +391,8 @@ def run_pipeline(
             },
             repo_root=target_repo_root,
             prompt_file=coder_prompt,
+            prompt_text=render_template_file(coder_template, context),
+            save_prompt_file=save_prompt_files,
             output_file=coder_output,
             log_file=run_dir / f"coder_command_attempt_{attempt}.log",
             required_output=False,
@@ -390,6 +403,9 @@ def run_pipeline(
             repo_root=target_repo_root,
             run_dir=run_dir,
             attempt=attempt,
+            concurrency=quality_gate_concurrency,
+            parallel=[is_parallel for _, is_parallel in quality_gate_specs],
+            fail_fast=quality_gate_fail_fast,
         )
         write_text(run_dir / f"validation_attempt_{attempt}.md", summary + "\n")
         last_validation = summary
@@ -424,7 +440,6 @@ def run_pipeline(
     if reviewer_cmd:
         reviewer_prompt = run_dir / "reviewer_prompt.md"
         context["output_file"] = str(review_file)
-        write_text(reviewer_prompt, render_template_file(reviewer_template, context))
         run_agent_command(
             step_name="reviewer",
             command_template=reviewer_cmd,
@@ -435,12 +450,15 @@ def run_pipeline(
             },
             repo_root=target_repo_root,
             prompt_file=reviewer_prompt,
+            prompt_text=render_template_file(reviewer_template, context),
+            save_prompt_file=save_prompt_files,
             output_file=review_file,
             log_file=run_dir / "reviewer_command.log",
             required_output=False,
         )
-        if review_file.exists() and read_text(review_file).strip():
-            context["review_markdown"] = read_text(review_file)
+        review_text = read_text(review_file) if review_file.exists() else ""
+        if review_text.strip():
+            context["review_markdown"] = review_text
     else:
         write_text(review_file, "_Reviewer command is not configured._\n")
     
@@ -479,7 +497,8 @@ def run_pipeline(
             repo_slug=repo_slug,
         )
     )
-    context["log_location_markdown"] = render_log_location_markdown(context)
+    # ログの場所はコミット結果（UI証跡・AIログURL）を反映してから描画する。
+    # ここで描画しても、コミット成功時は後段で必ず描き直すため省く。
     
     removed_stray_outputs = cleanup_untracked_coder_outputs(target_repo_root)
     if removed_stray_outputs:
@@ -548,6 +567,7 @@ def run_pipeline(
             context["entire_checkpoint"] = "no-change"
             context["entire_trace_verify_status"] = "skipped-no-change"
             context["entire_explain_status"] = "skipped-no-change"
+            context["log_location_markdown"] = render_log_location_markdown(context)
             write_text(
                 run_dir / "no_change.md",
                 (
@@ -578,7 +598,7 @@ def run_pipeline(
             raise
     
     if not commit_skipped_no_change:
-        head_commit = get_head_commit_sha(target_repo_root)
+        head_commit, commit_body = get_head_commit_info(target_repo_root)
         context["head_commit"] = head_commit
         if context.get("ai_logs_status") == "saved" and repo_slug:
             ai_logs_index_file = str(context.get("ai_logs_index_file", "")).strip()
@@ -597,7 +617,6 @@ def run_pipeline(
     
         entire_checkpoint = ""
         if context.get("entire_status") == "enabled" and context.get("entire_verify_trailer"):
-            commit_body = get_head_commit_message(target_repo_root)
             trailer_key = str(context.get("entire_trailer_key", "Entire-Checkpoint"))
             entire_checkpoint = extract_commit_trailer(commit_body, trailer_key)
             if not entire_checkpoint:
@@ -613,6 +632,7 @@ def run_pipeline(
             repo_root=target_repo_root,
             run_dir=run_dir,
             context=context,
+            commit_message=commit_body,
         )
         context.update(explicit_verify_state)
     
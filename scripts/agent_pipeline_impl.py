@@ -16,9 +16,12 @@ try:
         clip_inline_text,
         clip_text,
         detect_repo_slug,
+        GitCatFileBatch,
         format_template,
         git,
+        git_add_pathspecs,
         load_json,
+        loads_json,
         merge_dict,
         normalize_inline_text,
         normalize_repo_path,
@@ -26,12 +29,15 @@ try:
         parse_positive_int,
         parse_string_list,
         read_text,
+        read_text_head_with_sha256,
+        render_status_markdown,
         require_clean_worktree,
         resolve_path,
         resolve_repo_relative_path,
         run_logged_process,
         run_process,
-        run_shell,
+        run_process_spooled,
+        sha256_file,
         sha256_text,
         slugify,
         validate_config,
@@ -42,9 +48,12 @@ except ModuleNotFoundError:
         clip_inline_text,
         clip_text,
         detect_repo_slug,
+        GitCatFileBatch,
         format_template,
         git,
+        git_add_pathspecs,
         load_json,
+        loads_json,
         merge_dict,
         normalize_inline_text,
         normalize_repo_path,
@@ -52,12 +61,15 @@ except ModuleNotFoundError:
         parse_positive_int,
         parse_string_list,
         read_text,
+        read_text_head_with_sha256,
+        render_status_markdown,
         require_clean_worktree,
         resolve_path,
         resolve_repo_relative_path,
         run_logged_process,
         run_process,
-        run_shell,
+        run_process_spooled,
+        sha256_file,
         sha256_text,
         slugify,
         validate_config,
@@ -100,13 +112,15 @@ except ModuleNotFoundError:
     from scripts.agent_pipeline_entire import PipelineEntireService
 
 try:
-    from agent_pipeline_pr import PipelinePullRequestService
+    from agent_pipeline_pr import GitHubRestClient, PipelinePullRequestService
 except ModuleNotFoundError:
-    from scripts.agent_pipeline_pr import PipelinePullRequestService
+    from scripts.agent_pipeline_pr import GitHubRestClient, PipelinePullRequestService
 
 
 DEFAULT_CONFIG_PATH = Path(".agent/pipeline.json")
 DEFAULT_PROJECTS_PATH = Path(".agent/projects.json")
+PROMPT_STDIN_MARKER = "{prompt_stdin}"
+CODER_OUTPUT_FILE_PATTERN = re.compile(r"coder_output_attempt_[0-9]+\.md")
 
 
 def log(message: str) -> None:
@@ -114,7 +128,7 @@ def log(message: str) -> None:
 
 
 def is_coder_output_filename(name: str) -> bool:
-    return bool(re.fullmatch(r"coder_output_attempt_[0-9]+\.md", name))
+    return bool(CODER_OUTPUT_FILE_PATTERN.fullmatch(name))
 
 
 def recover_coder_output_file(
@@ -146,22 +160,26 @@ def recover_coder_output_file(
 
 
 def cleanup_untracked_coder_outputs(repo_root: Path) -> list[str]:
+    # repository root を 1 回だけ走査し、追跡状況もまとめて 1 回の ls-files で確認する。
+    candidates: list[str] = []
+    try:
+        with os.scandir(repo_root) as entries:
+            for entry in entries:
+                if is_coder_output_filename(entry.name) and entry.is_file():
+                    candidates.append(normalize_repo_path(entry.name))
+    except FileNotFoundError:
+        return []
+    if not candidates:
+        return []
+
+    proc = git(["ls-files", "-z", "--", *candidates], cwd=repo_root, check=False)
+    tracked = {name for name in proc.stdout.split("\0") if name} if proc.returncode == 0 else set(candidates)
+
     removed: list[str] = []
-    for file_path in sorted(repo_root.glob("coder_output_attempt_*.md")):
-        if not file_path.is_file() or not is_coder_output_filename(file_path.name):
+    for relative in sorted(candidates):
+        if relative in tracked:
             continue
-        relative = normalize_repo_path(file_path.relative_to(repo_root).as_posix())
-        tracked = (
-            git(
-                ["ls-files", "--error-unmatch", "--", relative],
-                cwd=repo_root,
-                check=False,
-            ).returncode
-            == 0
-        )
-        if tracked:
-            continue
-        file_path.unlink(missing_ok=True)
+        (repo_root / relative).unlink(missing_ok=True)
         removed.append(relative)
     return removed
 
@@ -178,6 +196,16 @@ CONVENTIONAL_PR_TYPES = (
     "ci",
     "revert",
 )
+ISSUE_TITLE_BRACKET_PREFIX_PATTERN = re.compile(r"^(?:\[[^\]]+\]|【[^】]+】|\([^)]+\))\s*")
+ISSUE_TITLE_AGENT_PREFIX_PATTERN = re.compile(
+    r"^(?:エージェント作業|agent task|agent)\s*[:：\-]?\s*",
+    re.IGNORECASE,
+)
+CONVENTIONAL_PR_PREFIX_PATTERN = re.compile(
+    r"^(?P<type>" + "|".join(CONVENTIONAL_PR_TYPES) + r")(?:\([^)]+\))?:\s+\S",
+    re.IGNORECASE,
+)
+TEST_FILE_PATH_PATTERN = re.compile(r"(?:^|/).*(?:_test\.|\.spec\.|\.test\.)")
 
 
 def strip_issue_title_prefixes(title: str) -> str:
@@ -186,31 +214,17 @@ def strip_issue_title_prefixes(title: str) -> str:
         return ""
 
     while True:
-        updated = re.sub(
-            r"^(?:\[[^\]]+\]|【[^】]+】|\([^)]+\))\s*",
-            "",
-            cleaned,
-        ).strip()
+        updated = ISSUE_TITLE_BRACKET_PREFIX_PATTERN.sub("", cleaned).strip()
         if updated == cleaned:
             break
         cleaned = updated
 
-    cleaned = re.sub(
-        r"^(?:エージェント作業|agent task|agent)\s*[:：\-]?\s*",
-        "",
-        cleaned,
-        flags=re.IGNORECASE,
-    ).strip()
+    cleaned = ISSUE_TITLE_AGENT_PREFIX_PATTERN.sub("", cleaned).strip()
     return cleaned
 
 
 def has_conventional_pr_prefix(title: str) -> bool:
-    pattern = (
-        r"^(?:"
-        + "|".join(CONVENTIONAL_PR_TYPES)
-        + r")(?:\([^)]+\))?:\s+\S"
-    )
-    return bool(re.match(pattern, title, flags=re.IGNORECASE))
+    return bool(CONVENTIONAL_PR_PREFIX_PATTERN.match(title))
 
 
 def infer_pr_type_from_issue(*, issue_title: str, issue_labels: list[str]) -> str:
@@ -249,12 +263,7 @@ def build_default_pr_title(*, issue_title: str, issue_labels: list[str]) -> str:
 
 
 def extract_conventional_pr_type(title: str) -> str:
-    pattern = (
-        r"^(?P<type>"
-        + "|".join(CONVENTIONAL_PR_TYPES)
-        + r")(?:\([^)]+\))?:\s+\S"
-    )
-    match = re.match(pattern, title, flags=re.IGNORECASE)
+    match = CONVENTIONAL_PR_PREFIX_PATTERN.match(title)
     if not match:
         return ""
     return str(match.group("type")).lower()
@@ -279,7 +288,7 @@ def build_pr_change_type_checklist_markdown(
         (
             "/tests/" in f"/{path}"
             or "/test/" in f"/{path}"
-            or re.search(r"(?:^|/).*(?:_test\.|\.spec\.|\.test\.)", path)
+            or TEST_FILE_PATH_PATTERN.search(path)
         )
         for path in lowered_paths
     )
@@ -380,7 +389,6 @@ def summary_service() -> PipelineCommitSummaryService:
                 template_name,
             ),
             normalize_repo_path=normalize_repo_path,
-            extract_attempt_index=extract_attempt_index,
             read_text=read_text,
             write_text=write_text,
             log=log,
@@ -540,6 +548,7 @@ def issue_service() -> PipelineIssueService:
             normalize_inline_text=normalize_inline_text,
             clip_inline_text=lambda value, *, max_chars: clip_inline_text(value, max_chars=max_chars),
             clip_text=lambda value, *, max_chars: clip_text(value, max_chars=max_chars),
+            loads_json=loads_json,
         )
     return _ISSUE_SERVICE
 
@@ -585,43 +594,53 @@ def run_agent_command(
     context: dict[str, Any],
     repo_root: Path,
     prompt_file: Path,
+    prompt_text: str,
     output_file: Path,
     log_file: Path,
     required_output: bool,
+    save_prompt_file: bool = True,
 ) -> None:
-    rendered = format_template(command_template, context, f"{step_name} command")
-    log(f"Running {step_name} command")
-    proc = run_shell(rendered, cwd=repo_root, check=False)
-
-    output = (
-        f"# Command\n\n{rendered}\n\n"
-        f"# Exit Code\n\n{proc.returncode}\n\n"
-        f"# Stdout\n\n{proc.stdout}\n\n"
-        f"# Stderr\n\n{proc.stderr}\n"
+    # コマンドに {prompt_stdin} があればプロンプトを標準入力で渡す。その場合に限り、
+    # save_prompt_file=False ならプロンプトファイルの書き出しを省く。
+    reads_stdin = PROMPT_STDIN_MARKER in command_template
+    writes_prompt_file = save_prompt_file or not reads_stdin
+    if writes_prompt_file:
+        write_text(prompt_file, prompt_text)
+    rendered = format_template(
+        command_template.replace(PROMPT_STDIN_MARKER, ""),
+        context,
+        f"{step_name} command",
     )
-    write_text(log_file, output)
+    log(f"Running {step_name} command")
+    # エージェントの出力は大きくなり得るため、メモリに溜めず一時ファイル経由でログへ流す。
+    with run_process_spooled(
+        ["bash", "-lc", rendered],
+        cwd=repo_root,
+        input=prompt_text if reads_stdin else None,
+    ) as proc:
+        proc.write_log(log_file, title="Command", command=rendered)
 
-    if proc.returncode != 0:
-        stdout_excerpt = clip_text(proc.stdout.strip(), max_chars=1200)
-        stderr_excerpt = clip_text(proc.stderr.strip(), max_chars=1200)
-        raise RuntimeError(
-            (
-                f"{step_name} command failed. See {log_file} for details.\n"
-                f"exit={proc.returncode}\n"
-                f"stdout_excerpt:\n{stdout_excerpt or '(empty)'}\n"
-                f"stderr_excerpt:\n{stderr_excerpt or '(empty)'}"
+        if proc.returncode != 0:
+            stdout_excerpt = clip_text(proc.stdout_head().strip(), max_chars=1200)
+            stderr_excerpt = clip_text(proc.stderr_head().strip(), max_chars=1200)
+            raise RuntimeError(
+                (
+                    f"{step_name} command failed. See {log_file} for details.\n"
+                    f"exit={proc.returncode}\n"
+                    f"stdout_excerpt:\n{stdout_excerpt or '(empty)'}\n"
+                    f"stderr_excerpt:\n{stderr_excerpt or '(empty)'}"
+                )
             )
-        )
 
-    recover_coder_output_file(
-        repo_root=repo_root,
-        output_file=output_file,
-    )
+        recover_coder_output_file(
+            repo_root=repo_root,
+            output_file=output_file,
+        )
 
-    if not output_file.exists():
-        stdout = proc.stdout.strip()
-        if stdout:
-            write_text(output_file, stdout + "\n")
+        if not output_file.exists():
+            stdout = proc.read_stdout().strip()
+            if stdout:
+                write_text(output_file, stdout + "\n")
 
     if required_output:
         content = read_text(output_file).strip() if output_file.exists() else ""
@@ -631,43 +650,147 @@ def run_agent_command(
                 f"Expected output at {output_file}."
             )
 
-    if not prompt_file.exists():
+    if writes_prompt_file and not prompt_file.exists():
         raise RuntimeError(f"{step_name} prompt file missing: {prompt_file}")
 
 
+def parse_quality_gates(value: Any) -> list[tuple[str, bool]]:
+    # quality_gates の要素は文字列か {"command": ..., "parallel": false} 形式。
+    # parallel: false のゲート（作業ツリーを書き換える install など）は並列実行時も直列で先に流す。
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise RuntimeError("Config 'quality_gates' must be a list.")
+    gates: list[tuple[str, bool]] = []
+    for item in value:
+        if isinstance(item, dict):
+            command = str(item.get("command", "")).strip()
+            if not command:
+                raise RuntimeError("Config 'quality_gates' entries must have a non-empty 'command'.")
+            gates.append((command, bool(item.get("parallel", True))))
+            continue
+        gates.append((str(item), True))
+    return gates
+
+
 def run_quality_gates(
     *,
     gates: list[str],
     repo_root: Path,
     run_dir: Path,
     attempt: int,
+    concurrency: int = 1,
+    parallel: list[bool] | None = None,
+    fail_fast: bool = False,
 ) -> tuple[bool, str]:
     if not gates:
         return True, "- No quality gates configured."
 
-    lines: list[str] = []
-    for idx, gate in enumerate(gates, start=1):
+    def run_gate(idx: int, gate: str) -> tuple[bool, Path]:
         gate_log = run_dir / f"gate-attempt-{attempt}-{idx}.log"
-        proc = run_shell(gate, cwd=repo_root, check=False)
-        gate_report = (
-            f"# Gate\n\n{gate}\n\n"
-            f"# Exit Code\n\n{proc.returncode}\n\n"
-            f"# Stdout\n\n{proc.stdout}\n\n"
-            f"# Stderr\n\n{proc.stderr}\n"
-        )
-        write_text(gate_log, gate_report)
-        if proc.returncode == 0:
-            lines.append(f"- PASS `{gate}`")
+        # テストランナーの出力は大きくなりがちなので、メモリに載せず一時ファイルからログへ流す。
+        with run_process_spooled(["bash", "-lc", gate], cwd=repo_root) as proc:
+            proc.write_log(gate_log, title="Gate", command=gate)
+        return proc.returncode == 0, gate_log
+
+    def render(results: dict[int, tuple[bool, Path]]) -> tuple[bool, str]:
+        # 実行したゲートだけを設定順に並べる（打ち切りで実行しなかったものは載せない）。
+        lines: list[str] = []
+        for idx, gate in enumerate(gates, start=1):
+            if idx not in results:
+                continue
+            passed, gate_log = results[idx]
+            if passed:
+                lines.append(f"- PASS `{gate}`")
+            else:
+                lines.append(f"- FAIL `{gate}` (see `{gate_log}`)")
+        return all(passed for passed, _ in results.values()), "\n".join(lines)
+
+    results: dict[int, tuple[bool, Path]] = {}
+    if concurrency <= 1 or len(gates) == 1:
+        # 既定は従来どおり順に実行し、最初の失敗で打ち切る（前段に依存するゲートがあり得るため）。
+        for idx, gate in enumerate(gates, start=1):
+            results[idx] = run_gate(idx, gate)
+            if not results[idx][0]:
+                break
+        return render(results)
+
+    # parallel: false のゲートを設定順に直列で先に実行し、残りを互いに独立したゲートとして並列実行する。
+    # 実体はサブプロセス待ちなのでスレッドで足りる。fail_fast なら最初の失敗で未着手のゲートを取り消す。
+    flags = parallel if parallel is not None and len(parallel) == len(gates) else [True] * len(gates)
+    parallel_indexes: list[int] = []
+    for idx, (gate, is_parallel) in enumerate(zip(gates, flags), start=1):
+        if is_parallel:
+            parallel_indexes.append(idx)
             continue
+        results[idx] = run_gate(idx, gate)
+        if fail_fast and not results[idx][0]:
+            return render(results)
+    if not parallel_indexes:
+        return render(results)
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    workers = min(concurrency, len(parallel_indexes), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(run_gate, idx, gates[idx - 1]): idx for idx in parallel_indexes}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            failed = False
+            for future in done:
+                results[pending.pop(future)] = future.result()
+                failed = failed or not future.result()[0]
+            if fail_fast and failed:
+                # 実行中のゲートは止めずに結果を待ち、未着手のものだけ取り消す。
+                for future in list(pending):
+                    if future.cancel():
+                        pending.pop(future)
+    return render(results)
+
+
+_TEMPLATE_SOURCE_CACHE: dict[Path, tuple[tuple[int, int], str]] = {}
+
+
+def read_template_source(path: Path) -> str:
+    # テンプレートは試行ごと・実行ごとに同じファイルを描画するため、
+    # (mtime_ns, size) が変わらない限り読み込み済みの本文を使い回す。
+    stat_result = path.stat()
+    signature = (stat_result.st_mtime_ns, stat_result.st_size)
+    cached = _TEMPLATE_SOURCE_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    source = read_text(path)
+    _TEMPLATE_SOURCE_CACHE[path] = (signature, source)
+    return source
+
 
-        lines.append(f"- FAIL `{gate}` (see `{gate_log}`)")
-        return False, "\n".join(lines)
+def render_template_file(path: Path, context: dict[str, Any]) -> str:
+    return format_template(read_template_source(path), context, str(path))
 
-    return True, "\n".join(lines)
 
+def _probe_remote_heads(repo_root: Path, branches: list[str]) -> dict[str, str] | None:
+    # 1 回の ls-remote で複数ブランチの remote 側 SHA を得る。ls-remote のパターンは末尾一致なので
+    # refs/heads/ 付きで渡したうえで完全一致だけを採用する。通信に失敗した場合は None を返す。
+    refs = [f"refs/heads/{branch}" for branch in branches]
+    proc = git(["ls-remote", "origin", *refs], cwd=repo_root, check=False)
+    if proc.returncode != 0:
+        return None
+    wanted = set(refs)
+    heads: dict[str, str] = {}
+    for line in proc.stdout.splitlines():
+        sha, _, ref = line.partition("\t")
+        if ref in wanted:
+            heads[ref.removeprefix("refs/heads/")] = sha.strip()
+    return heads
 
-def render_template_file(path: Path, context: dict[str, Any]) -> str:
-    return format_template(read_text(path), context, str(path))
+
+def _list_local_ref_shas(repo_root: Path, refs: list[str]) -> dict[str, str]:
+    proc = git(["for-each-ref", "--format=%(refname) %(objectname)", *refs], cwd=repo_root, check=False)
+    shas: dict[str, str] = {}
+    for line in proc.stdout.splitlines():
+        ref, _, sha = line.partition(" ")
+        shas[ref] = sha.strip()
+    return shas
 
 
 def ensure_branch(
@@ -676,24 +799,54 @@ def ensure_branch(
     branch_name: str,
     *,
     sync_base: bool,
+    fast_sync: bool = True,
 ) -> None:
-    if sync_base:
-        git(["fetch", "origin", base_branch], cwd=repo_root, check=False)
-    git(["fetch", "origin", branch_name], cwd=repo_root, check=False)
-
-    git(["checkout", base_branch], cwd=repo_root)
-
-    if sync_base:
-        git(["pull", "--ff-only", "origin", base_branch], cwd=repo_root, check=False)
-
-    remote_branch_exists = (
-        git(
-            ["ls-remote", "--exit-code", "--heads", "origin", branch_name],
-            cwd=repo_root,
-            check=False,
-        ).returncode
-        == 0
-    )
+    # fast_sync では remote の SHA を先に 1 回だけ確認し、手元の ref が既に一致している
+    # fetch / pull を省く。確認できなかった場合は従来どおり毎回 fetch / pull する。
+    remote_heads = _probe_remote_heads(repo_root, [base_branch, branch_name]) if fast_sync else None
+    if remote_heads is None:
+        if sync_base:
+            git(["fetch", "origin", base_branch], cwd=repo_root, check=False)
+        git(["fetch", "origin", branch_name], cwd=repo_root, check=False)
+
+        git(["checkout", base_branch], cwd=repo_root)
+
+        if sync_base:
+            git(["pull", "--ff-only", "origin", base_branch], cwd=repo_root, check=False)
+
+        remote_branch_exists = (
+            git(
+                ["ls-remote", "--exit-code", "--heads", "origin", branch_name],
+                cwd=repo_root,
+                check=False,
+            ).returncode
+            == 0
+        )
+    else:
+        remote_base_sha = remote_heads.get(base_branch, "")
+        remote_branch_sha = remote_heads.get(branch_name, "")
+        local_shas = _list_local_ref_shas(
+            repo_root,
+            [
+                f"refs/heads/{base_branch}",
+                f"refs/remotes/origin/{base_branch}",
+                f"refs/remotes/origin/{branch_name}",
+            ],
+        )
+        sync_base = sync_base and bool(remote_base_sha)
+        if sync_base and local_shas.get(f"refs/remotes/origin/{base_branch}") != remote_base_sha:
+            git(["fetch", "origin", base_branch], cwd=repo_root, check=False)
+        if remote_branch_sha and local_shas.get(f"refs/remotes/origin/{branch_name}") != remote_branch_sha:
+            git(["fetch", "origin", branch_name], cwd=repo_root, check=False)
+
+        git(["checkout", base_branch], cwd=repo_root)
+
+        # 追跡 ref は直前の fetch で最新になっているため、pull で再度取得せず早送りだけ行う。
+        if sync_base and local_shas.get(f"refs/heads/{base_branch}") != remote_base_sha:
+            git(["merge", "--ff-only", f"refs/remotes/origin/{base_branch}"], cwd=repo_root, check=False)
+
+        remote_branch_exists = bool(remote_branch_sha)
+
     if remote_branch_exists:
         git(["checkout", "-B", branch_name, f"origin/{branch_name}"], cwd=repo_root)
         return
@@ -730,7 +883,14 @@ def entire_service() -> PipelineEntireService:
             ),
             read_text=read_text,
             write_text=write_text,
+            render_status_markdown=render_status_markdown,
             sha256_text=sha256_text,
+            sha256_file=sha256_file,
+            read_text_head_with_sha256=lambda path, *, max_chars: read_text_head_with_sha256(
+                path,
+                max_chars=max_chars,
+            ),
+            git_cat_file_batch=GitCatFileBatch,
             clip_text=lambda content, *, max_chars: clip_text(content, max_chars=max_chars),
             git=git,
             log=log,
@@ -763,11 +923,46 @@ def ui_service() -> PipelineUiEvidenceService:
             normalize_repo_slug=normalize_repo_slug,
             slugify=slugify,
             git=git,
+            git_cat_file_batch=GitCatFileBatch,
             log=log,
         )
     return _UI_SERVICE
 
 
+def _list_staged_paths(repo_root: Path) -> list[str]:
+    # -z 区切りなら改行や非 ASCII を含むパスもクォートされずにそのまま得られる。
+    # 非 UTF-8 のファイル名でも失敗しないよう、bytes で受けて os.fsdecode で復号する。
+    proc = run_process(["git", "diff", "--cached", "--name-only", "-z"], cwd=repo_root, binary=True)
+    return [os.fsdecode(item) for item in proc.stdout.split(b"\x00") if item]
+
+
+def _normalize_repo_path_set(items: list[Any] | None) -> set[str]:
+    # 空要素を先に除いてから正規化し、str() 変換も要素ごとに 1 回で済ませる。
+    normalized: set[str] = set()
+    for item in items or []:
+        text = str(item)
+        if text.strip():
+            normalized.add(normalize_repo_path(text))
+    return normalized
+
+
+def _classify_staged_paths(
+    staged_paths: list[str],
+    *,
+    ignore_set: set[str],
+    required_set: set[str],
+) -> tuple[list[str], list[str]]:
+    # staged パスの正規化は 1 回だけ行い、ignore 判定と required の欠落判定で共有する。
+    normalized_staged = [normalize_repo_path(path) for path in staged_paths]
+    meaningful_changes = [
+        path
+        for path, normalized in zip(staged_paths, normalized_staged)
+        if normalized not in ignore_set
+    ]
+    missing_required = sorted(required_set.difference(normalized_staged))
+    return meaningful_changes, missing_required
+
+
 def commit_changes(
     repo_root: Path,
     message: str,
@@ -780,41 +975,26 @@ def commit_changes(
     required_paths: list[str] | None = None,
 ) -> dict[str, Any]:
     git(["add", "-A"], cwd=repo_root)
-    force_add_set = {
-        normalize_repo_path(str(item))
-        for item in (force_add_paths or [])
-        if str(item).strip()
-    }
-    for path in sorted(force_add_set):
-        git(["add", "-f", "--", path], cwd=repo_root)
+    force_add_set = _normalize_repo_path_set(force_add_paths)
+    git_add_pathspecs(sorted(force_add_set), cwd=repo_root, force=True)
 
-    staged_names = git(["diff", "--cached", "--name-only"], cwd=repo_root)
-    staged_paths = [line.strip() for line in staged_names.stdout.splitlines() if line.strip()]
+    staged_paths = _list_staged_paths(repo_root)
     if not staged_paths:
         raise RuntimeError("No file changes were created by the coder agent.")
 
-    ignore_set = {
-        normalize_repo_path(str(item))
-        for item in (ignore_paths or [])
-        if str(item).strip()
-    }
-    meaningful_changes = [
-        path
-        for path in staged_paths
-        if normalize_repo_path(path) not in ignore_set
-    ]
+    ignore_set = _normalize_repo_path_set(ignore_paths)
+    required_set = _normalize_repo_path_set(required_paths)
+    meaningful_changes, missing_required = _classify_staged_paths(
+        staged_paths,
+        ignore_set=ignore_set,
+        required_set=required_set,
+    )
     if not meaningful_changes:
         raise RuntimeError(
             "No file changes were created by the coder agent. "
             "Only trace artifact files were changed."
         )
 
-    required_set = {
-        normalize_repo_path(str(item))
-        for item in (required_paths or [])
-        if str(item).strip()
-    }
-    missing_required = sorted(path for path in required_set if path not in staged_paths)
     if missing_required:
         joined = ", ".join(missing_required)
         raise RuntimeError(
@@ -849,27 +1029,33 @@ def commit_changes(
             context=context,
         )
 
-        staged_names = git(["diff", "--cached", "--name-only"], cwd=repo_root)
-        staged_paths = [line.strip() for line in staged_names.stdout.splitlines() if line.strip()]
-        if not staged_paths:
-            raise RuntimeError("No file changes were created by the coder agent.")
-        meaningful_changes = [
-            path
-            for path in staged_paths
-            if normalize_repo_path(path) not in ignore_set
-        ]
-        if not meaningful_changes:
-            raise RuntimeError(
-                "No file changes were created by the coder agent. "
-                "Only trace artifact files were changed."
-            )
-        missing_required = sorted(path for path in required_set if path not in staged_paths)
-        if missing_required:
-            joined = ", ".join(missing_required)
-            raise RuntimeError(
-                "Required trace artifact files are not staged for commit: "
-                f"{joined}"
+        # インデックスを書き換えるのは artifact-only で証跡画像を restore した場合だけなので、
+        # それ以外はステージ済みパスを取り直す git 呼び出しを省く。
+        index_restored = (
+            ui_evidence_state.get("ui_evidence_status") == "attached"
+            and ui_evidence_state.get("ui_evidence_delivery_mode") == "artifact-only"
+            and bool(ui_evidence_state.get("ui_evidence_commit_image_files"))
+        )
+        if index_restored:
+            staged_paths = _list_staged_paths(repo_root)
+            if not staged_paths:
+                raise RuntimeError("No file changes were created by the coder agent.")
+            meaningful_changes, missing_required = _classify_staged_paths(
+                staged_paths,
+                ignore_set=ignore_set,
+                required_set=required_set,
             )
+            if not meaningful_changes:
+                raise RuntimeError(
+                    "No file changes were created by the coder agent. "
+                    "Only trace artifact files were changed."
+                )
+            if missing_required:
+                joined = ", ".join(missing_required)
+                raise RuntimeError(
+                    "Required trace artifact files are not staged for commit: "
+                    f"{joined}"
+                )
 
         ui_appendix = str(ui_evidence_state.get("ui_evidence_appendix", "")).strip()
         if ui_appendix:
@@ -883,12 +1069,8 @@ def commit_changes(
     }
 
 
-def get_head_commit_sha(repo_root: Path) -> str:
-    return git(["rev-parse", "HEAD"], cwd=repo_root).stdout.strip()
-
-
-def get_head_commit_message(repo_root: Path) -> str:
-    return entire_service().get_head_commit_message(repo_root)
+def get_head_commit_info(repo_root: Path) -> tuple[str, str]:
+    return entire_service().get_head_commit_info(repo_root)
 
 
 def extract_commit_trailer(commit_message: str, trailer_key: str) -> str:
@@ -902,13 +1084,6 @@ def is_no_change_runtime_error(error: RuntimeError) -> bool:
     return message.startswith("No file changes were created by the coder agent.")
 
 
-def extract_attempt_index(file_name: str) -> int:
-    match = re.search(r"_attempt_(\d+)\.md$", file_name)
-    if not match:
-        return sys.maxsize
-    return int(match.group(1))
-
-
 def build_commit_message(base: str, appendix: str) -> str:
     base_text = base.strip()
     appendix_text = appendix.strip()
@@ -935,11 +1110,13 @@ def verify_entire_explicit_registration(
     repo_root: Path,
     run_dir: Path,
     context: dict[str, Any],
+    commit_message: str | None = None,
 ) -> dict[str, Any]:
     return entire_service().verify_entire_explicit_registration(
         repo_root=repo_root,
         run_dir=run_dir,
         context=context,
+        commit_message=commit_message,
     )
 
 
@@ -972,8 +1149,11 @@ def logs_service() -> PipelineAiLogsService:
             resolve_ui_image_extensions_from_config=ui.resolve_ui_image_extensions_from_config,
             to_evidence_filename=ui.to_evidence_filename,
             write_text=write_text,
+            render_status_markdown=render_status_markdown,
             log=log,
             git=git,
+            git_add_pathspecs=lambda paths, *, cwd, force: git_add_pathspecs(paths, cwd=cwd, force=force),
+            git_cat_file_batch=GitCatFileBatch,
         )
     return _LOGS_SERVICE
 
@@ -1013,6 +1193,8 @@ def pr_service() -> PipelinePullRequestService:
             run_process=run_process,
             read_text=read_text,
             log=log,
+            loads_json=loads_json,
+            rest_client=GitHubRestClient.from_env(),
         )
     return _PR_SERVICE
 
@@ -1087,6 +1269,7 @@ def build_execution_dependencies() -> dict[str, Any]:
         "run_agent_command": run_agent_command,
         "read_text": read_text,
         "run_quality_gates": run_quality_gates,
+        "parse_quality_gates": parse_quality_gates,
         "clip_text": clip_text,
         "build_codex_commit_summary": summary.build_codex_commit_summary,
         "prepare_entire_explicit_registration": prepare_entire_explicit_registration,
@@ -1098,8 +1281,7 @@ def build_execution_dependencies() -> dict[str, Any]:
         "build_commit_message": build_commit_message,
         "commit_changes": commit_changes,
         "is_no_change_runtime_error": is_no_change_runtime_error,
-        "get_head_commit_sha": get_head_commit_sha,
-        "get_head_commit_message": get_head_commit_message,
+        "get_head_commit_info": get_head_commit_info,
         "extract_commit_trailer": extract_commit_trailer,
         "verify_entire_explicit_registration": verify_entire_explicit_registration,
         "generate_entire_explain": generate_entire_explain,
@@ -9,6 +9,8 @@ import subprocess
 from pathlib import Path
 from typing import Any, Callable
 
+AGENT_COMMAND_COMMENT_PATTERN = re.compile(r"/agent(?:\s+[a-z0-9_-]+)?")
+
 
 class PipelineIssueService:
     """Encapsulates issue loading and PR feedback extraction operations."""
@@ -16,13 +18,14 @@ class PipelineIssueService:
     def __init__(
         self,
         *,
-        run_process: Callable[..., subprocess.CompletedProcess[str]],
+        run_process: Callable[..., subprocess.CompletedProcess[Any]],
         read_text: Callable[[Path], str],
         write_text: Callable[[Path, str], None],
         resolve_path: Callable[..., Path],
         normalize_inline_text: Callable[[str], str],
         clip_inline_text: Callable[..., str],
         clip_text: Callable[..., str],
+        loads_json: Callable[[str | bytes], Any],
     ) -> None:
         self._run_process = run_process
         self._read_text = read_text
@@ -31,6 +34,7 @@ class PipelineIssueService:
         self._normalize_inline_text = normalize_inline_text
         self._clip_inline_text = clip_inline_text
         self._clip_text = clip_text
+        self._loads_json = loads_json
 
     def load_issue_from_file(self, path: Path, issue_number: int) -> dict[str, Any]:
         body = self._read_text(path).strip()
@@ -57,17 +61,18 @@ class PipelineIssueService:
         if repo_slug:
             cmd.extend(["--repo", repo_slug])
 
-        proc = self._run_process(cmd, cwd=cwd, check=False)
+        # 添付を含む Issue 本文は大きくなり得るため、bytes のまま受けてデコードせずにパースする。
+        proc = self._run_process(cmd, cwd=cwd, check=False, binary=True)
         if proc.returncode != 0:
             target = repo_slug or str(cwd)
             raise RuntimeError(
                 "Unable to read issue from GitHub. "
                 "Use --issue-file for local runs or set GH_TOKEN for remote runs.\n"
                 f"target={target}\n"
-                f"stderr:\n{proc.stderr}"
+                f"stderr:\n{proc.stderr.decode('utf-8', errors='replace')}"
             )
 
-        payload = json.loads(proc.stdout)
+        payload = self._loads_json(proc.stdout)
         labels = [item["name"] for item in payload.get("labels", [])]
         return {
             "number": payload["number"],
@@ -83,15 +88,16 @@ class PipelineIssueService:
             ["gh", "api", endpoint],
             cwd=cwd,
             check=False,
+            binary=True,
         )
         if proc.returncode != 0:
-            detail = (proc.stderr or proc.stdout or "").strip()
+            detail = (proc.stderr or proc.stdout or b"").decode("utf-8", errors="replace").strip()
             raise RuntimeError(
                 f"GitHub API call failed: {endpoint}\n"
                 + (f"detail:\n{detail}" if detail else "")
             )
         try:
-            return json.loads(proc.stdout or "null")
+            return self._loads_json(proc.stdout or b"null")
         except json.JSONDecodeError as err:
             raise RuntimeError(f"GitHub API returned invalid JSON: {endpoint}") from err
 
@@ -110,7 +116,7 @@ class PipelineIssueService:
         normalized = self._normalize_inline_text(text).lower()
         if not normalized:
             return True
-        return bool(re.fullmatch(r"/agent(?:\s+[a-z0-9_-]+)?", normalized))
+        return bool(AGENT_COMMAND_COMMENT_PATTERN.fullmatch(normalized))
 
     def build_pr_feedback_digest(
         self,
@@ -3,11 +3,57 @@
 
 from __future__ import annotations
 
+import errno
+import json
+import os
+import posixpath
 import shutil
-import tempfile
+import threading
+import time
 from pathlib import Path
 from typing import Any, Callable
 
+AI_LOGS_COPY_WORKERS = 8
+AI_LOGS_FETCH_CACHE_FILE = "flowsmith-ai-logs-fetch.json"
+AI_LOGS_FETCH_CACHE_TTL_SECONDS = 60
+COPY_FILE_RANGE_MIN_BLOCK = 8 * 1024 * 1024
+COPY_FILE_RANGE_FALLBACK_ERRNOS = frozenset(
+    {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM}
+)
+
+
+def fast_copy_file(source: Path, destination: Path) -> None:
+    # Linux では copy_file_range でカーネル内コピーし、対応 FS（btrfs/XFS/NFS など）では
+    # CoW やサーバー側コピーに任せる。使えない環境やエラー時は shutil.copyfile（sendfile 等）へ戻す。
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+        try:
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                src_fd = src.fileno()
+                dst_fd = dst.fileno()
+                block = max(os.fstat(src_fd).st_size, COPY_FILE_RANGE_MIN_BLOCK)
+                while copy_file_range(src_fd, dst_fd, block):
+                    pass
+            return
+        except OSError as err:
+            if err.errno not in COPY_FILE_RANGE_FALLBACK_ERRNOS:
+                raise
+    shutil.copyfile(source, destination)
+
+
+def copy_files_parallel(sources: list[Path], destinations: list[Path]) -> None:
+    # コピー先ディレクトリは重複なく先に作っておき、コピー本体は I/O 待ちが主体なので
+    # スレッドで並列化する。ワーカー数は fd を使い切らないよう上限を設ける。
+    if not sources:
+        return
+    for parent in sorted({destination.parent for destination in destinations}):
+        parent.mkdir(parents=True, exist_ok=True)
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(AI_LOGS_COPY_WORKERS, len(sources))) as executor:
+        # 最初に失敗したコピーの例外がそのまま呼び出し側へ伝わる。
+        list(executor.map(fast_copy_file, sources, destinations))
+
 
 class PipelineAiLogsService:
     """Encapsulates ai-logs bundle and dedicated-branch publish operations."""
@@ -23,8 +69,11 @@ class PipelineAiLogsService:
         resolve_ui_image_extensions_from_config: Callable[[dict[str, Any]], list[str]],
         to_evidence_filename: Callable[..., str],
         write_text: Callable[[Path, str], None],
+        render_status_markdown: Callable[[str, dict[str, Any]], str],
         log: Callable[[str], None],
         git: Callable[..., Any],
+        git_add_pathspecs: Callable[..., None],
+        git_cat_file_batch: Callable[[Path], Any],
     ) -> None:
         self._normalize_repo_path = normalize_repo_path
         self._format_template = format_template
@@ -34,8 +83,11 @@ class PipelineAiLogsService:
         self._resolve_ui_image_extensions_from_config = resolve_ui_image_extensions_from_config
         self._to_evidence_filename = to_evidence_filename
         self._write_text = write_text
+        self._render_status_markdown = render_status_markdown
         self._log = log
         self._git = git
+        self._git_add_pathspecs = git_add_pathspecs
+        self._git_cat_file_batch = git_cat_file_batch
 
     def save_ai_logs_bundle(
         self,
@@ -91,20 +143,20 @@ class PipelineAiLogsService:
             if not source_files:
                 raise RuntimeError(f"ai-logs に保存するソースファイルがありません: {run_dir}")
 
-            copied_relative_paths: list[str] = []
-            for source in source_files:
-                relative_tail = source.relative_to(run_dir)
-                destination = logs_dir_path / relative_tail
-                destination.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(source, destination)
-                copied_relative_paths.append(
-                    self._normalize_repo_path(str(Path(dir_relative_path) / relative_tail))
-                )
+            relative_tails = [source.relative_to(run_dir) for source in source_files]
+            destinations = [logs_dir_path / relative_tail for relative_tail in relative_tails]
+            # ログはコミットするだけなので権限や mtime の複製（copy2 の追加 syscall）は不要。
+            copy_files_parallel(source_files, destinations)
+            # repo 相対パスは posix 形式なので、Path を組み立てずに文字列結合で作る。
+            copied_relative_paths: list[str] = [
+                self._normalize_repo_path(posixpath.join(dir_relative_path, relative_tail.as_posix()))
+                for relative_tail in relative_tails
+            ]
 
             # commit前に run_dir/ui-evidence が未生成のケースに備え、repo側のUI証跡も ai-logs に取り込む。
             ui_artifact_dir = self._resolve_ui_artifact_dir_from_config(config)
             ui_artifact_prefix = (
-                self._normalize_repo_path(str(Path(dir_relative_path) / ui_artifact_dir)).rstrip("/") + "/"
+                self._normalize_repo_path(posixpath.join(dir_relative_path, ui_artifact_dir)).rstrip("/") + "/"
             ).lower()
             has_ui_evidence_in_logs = any(
                 path.lower().startswith(ui_artifact_prefix) for path in copied_relative_paths
@@ -136,12 +188,12 @@ class PipelineAiLogsService:
                         file_name = self._to_evidence_filename(relative_source, used_names=used_names)
                         destination = ui_logs_dir / file_name
                         destination.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(source, destination)
+                        fast_copy_file(source, destination)
                         copied_relative_paths.append(
-                            self._normalize_repo_path(str(Path(dir_relative_path) / ui_artifact_dir / file_name))
+                            self._normalize_repo_path(posixpath.join(dir_relative_path, ui_artifact_dir, file_name))
                         )
 
-            index_relative_path = self._normalize_repo_path(str(Path(dir_relative_path) / index_file_name))
+            index_relative_path = self._normalize_repo_path(posixpath.join(dir_relative_path, index_file_name))
             index_path = self._resolve_repo_relative_path(
                 index_relative_path,
                 repo_root=repo_root,
@@ -176,11 +228,13 @@ class PipelineAiLogsService:
         copied_relative_paths = sorted(set(copied_relative_paths))
         self._write_text(
             run_dir / "ai_logs_status.md",
-            (
-                "- ai-logs を保存しました。\n"
-                f"- directory: `{dir_relative_path}`\n"
-                f"- index: `{index_relative_path}`\n"
-                f"- files: `{len(copied_relative_paths)}`\n"
+            self._render_status_markdown(
+                "ai-logs を保存しました。",
+                {
+                    "directory": dir_relative_path,
+                    "index": index_relative_path,
+                    "files": len(copied_relative_paths),
+                },
             ),
         )
         return {
@@ -245,31 +299,106 @@ class PipelineAiLogsService:
         repo_root: Path,
         relative_paths: list[str],
     ) -> None:
-        normalized_paths = sorted(
-            {
-                self._normalize_repo_path(str(item))
-                for item in relative_paths
-                if str(item).strip()
-            }
-        )
-        for relative_path in normalized_paths:
-            resolved = self._resolve_repo_relative_path(
-                relative_path,
-                repo_root=repo_root,
-                setting_name="ai_logs.path",
-            )
+        normalized_paths: set[str] = set()
+        for item in relative_paths:
+            text = str(item)
+            if text.strip():
+                normalized_paths.add(self._normalize_repo_path(text))
+        root = repo_root.resolve()
+        parent_dirs: set[Path] = set()
+        # 同じディレクトリ配下のファイルが大半なので、シンボリックリンク経由の逸脱検証（resolve）は
+        # 親ディレクトリごとに 1 回だけ行い、ファイルごとの構成要素 stat を省く。
+        resolved_parents: dict[str, Path] = {}
+        for relative_path in sorted(normalized_paths):
+            parent_relative, name = posixpath.split(relative_path)
+            if name in ("", ".", ".."):
+                resolved = self._resolve_repo_relative_path(
+                    relative_path,
+                    repo_root=repo_root,
+                    setting_name="ai_logs.path",
+                )
+            else:
+                parent = resolved_parents.get(parent_relative)
+                if parent is None:
+                    parent = self._resolve_repo_relative_path(
+                        parent_relative or ".",
+                        repo_root=repo_root,
+                        setting_name="ai_logs.path",
+                    )
+                    resolved_parents[parent_relative] = parent
+                resolved = parent / name
+            if resolved == root:
+                continue
             if resolved.is_file():
                 resolved.unlink()
             elif resolved.is_dir():
                 shutil.rmtree(resolved, ignore_errors=True)
             current = resolved.parent
-            while current != repo_root and current.exists():
-                try:
-                    current.rmdir()
-                except OSError:
-                    break
+            while current != root and current != current.parent and current not in parent_dirs:
+                parent_dirs.add(current)
                 current = current.parent
 
+        # 同じ親ディレクトリを共有するファイルごとに rmdir を繰り返さないよう、
+        # 親ディレクトリを重複なく集めて深い順に 1 回ずつ削除を試みる（空でなければ残る）。
+        for directory in sorted(parent_dirs, key=lambda item: len(item.parts), reverse=True):
+            try:
+                directory.rmdir()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _fetch_cache_path(repo_root: Path) -> Path | None:
+        # キャッシュは .git 配下に置き、作業ツリーやコミット対象には含めない。
+        # .git がファイル（worktree / submodule）の場合は git dir 解決に追加の git 呼び出しが要るため使わない。
+        git_dir = repo_root / ".git"
+        if not git_dir.is_dir():
+            return None
+        return git_dir / AI_LOGS_FETCH_CACHE_FILE
+
+    def _fetch_publish_branch(
+        self,
+        *,
+        repo_root: Path,
+        branch_name: str,
+        remote_ref: str,
+        ref_lookup: Any,
+    ) -> bool:
+        # 直近 AI_LOGS_FETCH_CACHE_TTL_SECONDS 秒以内に同じブランチを fetch 済みで、追跡 ref も
+        # 残っていればネットワーク往復を省く。追跡 ref が古くても push 時の non-fast-forward は
+        # 既存の pull --rebase で回復する。
+        cache_path = self._fetch_cache_path(repo_root)
+        cache: dict[str, Any] = {}
+        if cache_path is not None:
+            try:
+                loaded = json.loads(cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                loaded = {}
+            if isinstance(loaded, dict):
+                cache = loaded
+            fetched_at = cache.get(branch_name)
+            if (
+                isinstance(fetched_at, (int, float))
+                and 0 <= time.time() - fetched_at <= AI_LOGS_FETCH_CACHE_TTL_SECONDS
+                and ref_lookup.exists(f"{remote_ref}^{{commit}}")
+            ):
+                return True
+
+        fetched = (
+            self._git(
+                ["fetch", "--no-tags", "origin", f"+refs/heads/{branch_name}:{remote_ref}"],
+                cwd=repo_root,
+                check=False,
+            ).returncode
+            == 0
+        )
+        if fetched and cache_path is not None:
+            cache[branch_name] = time.time()
+            try:
+                cache_path.write_text(json.dumps(cache), encoding="utf-8")
+            except OSError:
+                pass
+        return fetched
+
     def publish_ai_logs_to_dedicated_branch(
         self,
         *,
@@ -322,56 +451,89 @@ class PipelineAiLogsService:
                 "ai_logs_publish_status": "failed",
             }
 
+        # 専用ブランチ公開は任意機能なので、tempfile は使う時だけ読み込む。
+        import tempfile
+
         worktree_dir = Path(tempfile.mkdtemp(prefix="flowsmith-ai-logs-"))
         worktree_added = False
         published_commit = ""
+        # 追跡 ref の確認と公開後のコミット解決は、同じ cat-file --batch-check プロセスで捌く。
+        ref_lookup = self._git_cat_file_batch(repo_root)
         try:
-            self._git(["fetch", "origin", branch_name], cwd=repo_root, check=False)
-            self._git(["worktree", "add", "--detach", str(worktree_dir), "HEAD"], cwd=repo_root)
-            worktree_added = True
-
-            remote_exists = (
-                self._git(
-                    ["ls-remote", "--exit-code", "--heads", "origin", branch_name],
-                    cwd=worktree_dir,
-                    check=False,
-                ).returncode
-                == 0
+            # 明示 refspec で 1 回だけ fetch し、その成否をリモートブランチの有無として扱う
+            # （ls-remote と worktree 内での再 fetch は不要）。続く worktree add -B で
+            # ブランチ作成とチェックアウトをまとめ、git プロセス数を 5 から 2 に減らす。
+            remote_ref = f"refs/remotes/origin/{branch_name}"
+            remote_exists = self._fetch_publish_branch(
+                repo_root=repo_root,
+                branch_name=branch_name,
+                remote_ref=remote_ref,
+                ref_lookup=ref_lookup,
             )
-            if remote_exists:
-                self._git(["fetch", "origin", branch_name], cwd=worktree_dir, check=False)
-                self._git(["checkout", "-B", branch_name, f"origin/{branch_name}"], cwd=worktree_dir)
-            else:
-                self._git(["checkout", "-B", branch_name], cwd=worktree_dir)
+            self._git(
+                [
+                    "worktree",
+                    "add",
+                    "-B",
+                    branch_name,
+                    str(worktree_dir),
+                    remote_ref if remote_exists else "HEAD",
+                ],
+                cwd=repo_root,
+            )
+            worktree_added = True
 
+            # パス検証と存在確認は順に行って従来どおり最初の不備で止め、コピーだけを並列化する。
+            # 存在確認はファイルごとの stat ではなく、親ディレクトリごとに 1 回の一覧取得で済ませる。
+            # source は resolve 済みなので、末尾要素が一覧にあれば実体が存在する。
+            publish_sources: list[Path] = []
+            publish_destinations: list[Path] = []
+            entries_by_parent: dict[Path, set[str]] = {}
             for relative_path in ai_logs_paths:
                 source = self._resolve_repo_relative_path(
                     relative_path,
                     repo_root=repo_root,
                     setting_name="ai_logs.path",
                 )
-                if not source.exists():
+                parent_entries = entries_by_parent.get(source.parent)
+                if parent_entries is None:
+                    try:
+                        parent_entries = set(os.listdir(source.parent))
+                    except OSError:
+                        parent_entries = set()
+                    entries_by_parent[source.parent] = parent_entries
+                if source.name not in parent_entries:
                     raise RuntimeError(
                         f"ai-logs 保存対象ファイルが見つかりません: {relative_path}"
                     )
-                destination = self._resolve_repo_relative_path(
-                    relative_path,
-                    repo_root=worktree_dir,
-                    setting_name="ai_logs.path",
+                publish_sources.append(source)
+                publish_destinations.append(
+                    self._resolve_repo_relative_path(
+                        relative_path,
+                        repo_root=worktree_dir,
+                        setting_name="ai_logs.path",
+                    )
                 )
-                destination.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(source, destination)
+            copy_files_parallel(publish_sources, publish_destinations)
 
             # ai-logs は対象リポジトリで ignore されている場合があるため強制追加する。
-            self._git(["add", "-f", "--", *ai_logs_paths], cwd=worktree_dir)
-            has_changes = self._git(["diff", "--cached", "--quiet"], cwd=worktree_dir, check=False)
-            if has_changes.returncode != 0:
-                publish_message = self._format_template(
-                    commit_message_template,
-                    context,
-                    "ai_logs.publish.commit_message",
-                )
-                self._git(["commit", "-m", publish_message], cwd=worktree_dir)
+            self._git_add_pathspecs(ai_logs_paths, cwd=worktree_dir, force=True)
+            # 差分の有無を事前に調べず、まずコミットを試みる。失敗した場合だけ staged 差分の有無を確認し、
+            # 差分なし（コミット不要）なら続行する。git のメッセージはロケール依存なので文字列では判定しない。
+            publish_message = self._format_template(
+                commit_message_template,
+                context,
+                "ai_logs.publish.commit_message",
+            )
+            commit_proc = self._git(["commit", "-m", publish_message], cwd=worktree_dir, check=False)
+            if commit_proc.returncode != 0:
+                has_changes = self._git(["diff", "--cached", "--quiet"], cwd=worktree_dir, check=False)
+                if has_changes.returncode != 0:
+                    raise RuntimeError(
+                        "ai-logs dedicated-branch へのコミットに失敗しました。\n"
+                        f"stdout:\n{commit_proc.stdout or ''}\n"
+                        f"stderr:\n{commit_proc.stderr or ''}"
+                    )
 
             push_proc = self._git(
                 ["push", "-u", "origin", branch_name],
@@ -389,7 +551,10 @@ class PipelineAiLogsService:
                         f"stderr:\n{push_stderr}"
                     )
 
-            published_commit = self._git(["rev-parse", "HEAD"], cwd=worktree_dir).stdout.strip()
+            # ブランチ ref は worktree と本体で共有されるため、worktree の HEAD と同じコミットを指す。
+            published_commit = ref_lookup.resolve(f"refs/heads/{branch_name}^{{commit}}")
+            if not published_commit:
+                published_commit = self._git(["rev-parse", "HEAD"], cwd=worktree_dir).stdout.strip()
         except (RuntimeError, OSError) as err:
             if required:
                 raise RuntimeError(
@@ -403,9 +568,19 @@ class PipelineAiLogsService:
                 "ai_logs_publish_status": "failed",
             }
         finally:
+            ref_lookup.close()
+            # 登録解除は git worktree remove で同期的に行う（残ると次回の worktree add -B が失敗する）。
+            # remove が失敗した場合などに残る一時ディレクトリの削除だけは待たずにバックグラウンドへ回す。
             if worktree_added:
                 self._git(["worktree", "remove", "--force", str(worktree_dir)], cwd=repo_root, check=False)
-            shutil.rmtree(worktree_dir, ignore_errors=True)
+            if worktree_dir.exists():
+                threading.Thread(
+                    target=shutil.rmtree,
+                    args=(worktree_dir,),
+                    kwargs={"ignore_errors": True},
+                    name="flowsmith-rmtree",
+                    daemon=True,
+                ).start()
 
         self.remove_ai_log_paths_from_worktree(
             repo_root=repo_root,
@@ -413,11 +588,13 @@ class PipelineAiLogsService:
         )
         self._write_text(
             run_dir / "ai_logs_publish_status.md",
-            (
-                "- ai-logs を dedicated-branch に反映しました。\n"
-                f"- branch: `{branch_name}`\n"
-                f"- commit: `{published_commit}`\n"
-                f"- files: `{len(ai_logs_paths)}`\n"
+            self._render_status_markdown(
+                "ai-logs を dedicated-branch に反映しました。",
+                {
+                    "branch": branch_name,
+                    "commit": published_commit,
+                    "files": len(ai_logs_paths),
+                },
             ),
         )
 
@@ -4,12 +4,122 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 import subprocess
 from pathlib import Path
 from typing import Any, Callable
 from urllib.parse import quote
 
+GITHUB_REST_HOST = "api.github.com"
+GITHUB_REST_TIMEOUT_SECONDS = 30.0
+GITHUB_REST_API_VERSION = "2022-11-28"
+GITHUB_REPO_URL_PREFIX_PATTERN = re.compile(r"^(?:https?://github\.com/|git@github\.com:)")
+PR_URL_NUMBER_PATTERN = re.compile(r"/pull/(\d+)")
+TRIGGERED_BY_LINE_PATTERN = re.compile(r"(?im)^Triggered by:\s*(.+?)\s*$")
+
+
+class GitHubRestRedirect(Exception):
+    """REST 呼び出しが 3xx を返した（リポジトリの改名・移管など）ことを表す。"""
+
+
+class GitHubRestClient:
+    """Minimal GitHub REST client that keeps one HTTPS connection alive across calls."""
+
+    def __init__(self, *, token: str, host: str = GITHUB_REST_HOST) -> None:
+        self._token = token
+        self._host = host
+        self._connection: Any = None
+
+    @classmethod
+    def from_env(cls) -> GitHubRestClient | None:
+        # トークンが無い・GHE・プロキシ経由の環境では gh CLI に任せる。
+        token = (os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN") or "").strip()
+        if not token:
+            return None
+        gh_host = (os.environ.get("GH_HOST") or "").strip().lower()
+        if gh_host and gh_host != "github.com":
+            return None
+        if any(os.environ.get(key) for key in ("HTTPS_PROXY", "https_proxy", "ALL_PROXY", "all_proxy")):
+            return None
+        return cls(token=token)
+
+    def _connect(self) -> Any:
+        if self._connection is None:
+            import http.client
+
+            self._connection = http.client.HTTPSConnection(
+                self._host,
+                timeout=GITHUB_REST_TIMEOUT_SECONDS,
+            )
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        fields: list[tuple[str, Any]] | None = None,
+    ) -> subprocess.CompletedProcess[str]:
+        """Call `endpoint` and return the result shaped like a `gh api` process.
+
+        `fields` follows `gh api -f/-F` semantics: a `key[]` entry appends to an array.
+        """
+        import http.client
+
+        payload: dict[str, Any] = {}
+        for key, value in fields or []:
+            if key.endswith("[]"):
+                payload.setdefault(key[:-2], []).append(value)
+            else:
+                payload[key] = value
+        body = json.dumps(payload).encode("utf-8") if payload else None
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {self._token}",
+            "User-Agent": "FlowSmith-agent-pipeline",
+            "X-GitHub-Api-Version": GITHUB_REST_API_VERSION,
+        }
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        path = "/" + endpoint.lstrip("/")
+
+        # keep-alive 済みの接続がサーバ側で切られていた場合だけ 1 回だけ張り直す。
+        for attempt in range(2):
+            reused = self._connection is not None
+            connection = self._connect()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                text = response.read().decode("utf-8", errors="replace")
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if not reused or attempt:
+                    raise
+            except (OSError, http.client.HTTPException):
+                self.close()
+                raise
+        args = ["GitHubRestClient", method, endpoint]
+        if 200 <= response.status < 300:
+            return subprocess.CompletedProcess(args, 0, stdout=text, stderr="")
+        if 300 <= response.status < 400:
+            # http.client はリダイレクトを追わないため、追従できる gh api に任せる。
+            # 3xx では更新は適用されていないので、更新系でも再実行して構わない。
+            raise GitHubRestRedirect(
+                f"{response.reason} (HTTP {response.status}) -> {response.getheader('Location') or '(no location)'}"
+            )
+        # gh api と同様に、失敗時は本文（エラーコード含む）を詳細として返す。
+        stderr = f"{response.reason} (HTTP {response.status})"
+        if text.strip():
+            stderr += f"\n{text.strip()}"
+        return subprocess.CompletedProcess(args, 1, stdout=text, stderr=stderr)
+
 
 class PipelinePullRequestService:
     """Encapsulates GitHub PR/label/comment operations."""
@@ -20,18 +130,21 @@ class PipelinePullRequestService:
         run_process: Callable[..., subprocess.CompletedProcess[str]],
         read_text: Callable[[Path], str],
         log: Callable[[str], None],
+        loads_json: Callable[[str | bytes], Any],
+        rest_client: GitHubRestClient | None = None,
     ) -> None:
         self._run_process = run_process
         self._read_text = read_text
         self._log = log
+        self._loads_json = loads_json
+        self._rest_client = rest_client
 
     @staticmethod
     def normalize_repo_slug(value: str) -> str:
         text = str(value or "").strip()
         if not text:
             return ""
-        text = re.sub(r"^https?://github\.com/", "", text)
-        text = re.sub(r"^git@github\.com:", "", text)
+        text = GITHUB_REPO_URL_PREFIX_PATTERN.sub("", text, count=1)
         text = text.removesuffix(".git")
         text = text.strip("/")
         parts = [part.strip() for part in text.split("/") if part.strip()]
@@ -49,12 +162,55 @@ class PipelinePullRequestService:
             raise RuntimeError(f"Invalid repository slug: {repo_slug}")
         return owner, repo
 
+    def _gh_api(
+        self,
+        endpoint: str,
+        *,
+        cwd: Path,
+        method: str = "GET",
+        fields: list[tuple[str, Any]] | None = None,
+        check: bool = False,
+    ) -> subprocess.CompletedProcess[str]:
+        # トークンがあれば REST を直接叩いて gh の起動コストを省き、無ければ gh api に任せる。
+        if self._rest_client is not None:
+            import http.client
+
+            try:
+                proc = self._rest_client.request(method, endpoint, fields=fields)
+            except GitHubRestRedirect as err:
+                self._log(f"WARNING: GitHub REST 呼び出しがリダイレクトされたため gh にフォールバックします: {err}")
+            except (OSError, http.client.HTTPException) as err:
+                if method != "GET":
+                    # 送信済みかもしれない更新系は二重実行を避けるため再送しない。
+                    proc = subprocess.CompletedProcess(
+                        ["GitHubRestClient", method, endpoint], 1, stdout="", stderr=str(err)
+                    )
+                    if check:
+                        raise RuntimeError(f"GitHub API call failed: {method} {endpoint}\ndetail:\n{err}") from err
+                    return proc
+                self._log(f"WARNING: GitHub REST 呼び出しに失敗したため gh にフォールバックします: {err}")
+            else:
+                if check and proc.returncode != 0:
+                    raise RuntimeError(
+                        f"GitHub API call failed: {method} {endpoint}\n"
+                        f"detail:\n{proc.stderr.strip()}"
+                    )
+                return proc
+
+        args = ["gh", "api"]
+        if method != "GET":
+            args.extend(["-X", method])
+        args.append(endpoint)
+        for key, value in fields or []:
+            # 文字列以外（bool/int）は gh の -F で型付きフィールドとして渡す。
+            if isinstance(value, str):
+                args.extend(["-f", f"{key}={value}"])
+            else:
+                args.extend(["-F", f"{key}={json.dumps(value)}"])
+        return self._run_process(args, cwd=cwd, check=check)
+
     def _gh_api_json(self, *, endpoint: str, cwd: Path) -> Any:
-        proc = self._run_process(
-            ["gh", "api", endpoint],
-            cwd=cwd,
-            check=False,
-        )
+        proc = self._gh_api(endpoint, cwd=cwd)
         if proc.returncode != 0:
             detail = (proc.stderr or proc.stdout or "").strip()
             raise RuntimeError(
@@ -62,7 +218,7 @@ class PipelinePullRequestService:
                 + (f"detail:\n{detail}" if detail else "")
             )
         try:
-            return json.loads(proc.stdout or "null")
+            return self._loads_json(proc.stdout or "null")
         except json.JSONDecodeError as err:
             raise RuntimeError(f"GitHub API returned invalid JSON: {endpoint}") from err
 
@@ -130,22 +286,11 @@ class PipelinePullRequestService:
         if not normalized_repo:
             return False
         color, description = self.build_default_label_spec(label_name)
-        create_proc = self._run_process(
-            [
-                "gh",
-                "api",
-                "-X",
-                "POST",
-                f"repos/{normalized_repo}/labels",
-                "-f",
-                f"name={label_name}",
-                "-f",
-                f"color={color}",
-                "-f",
-                f"description={description}",
-            ],
+        create_proc = self._gh_api(
+            f"repos/{normalized_repo}/labels",
             cwd=repo_root,
-            check=False,
+            method="POST",
+            fields=[("name", label_name), ("color", color), ("description", description)],
         )
         if create_proc.returncode == 0:
             self._log(f"INFO: PRラベルを作成しました: `{label_name}`")
@@ -156,22 +301,11 @@ class PipelinePullRequestService:
         if "already_exists" in lowered or "already exists" in lowered:
             return True
 
-        patch_proc = self._run_process(
-            [
-                "gh",
-                "api",
-                "-X",
-                "PATCH",
-                f"repos/{normalized_repo}/labels/{quote(label_name, safe='')}",
-                "-f",
-                f"new_name={label_name}",
-                "-f",
-                f"color={color}",
-                "-f",
-                f"description={description}",
-            ],
+        patch_proc = self._gh_api(
+            f"repos/{normalized_repo}/labels/{quote(label_name, safe='')}",
             cwd=repo_root,
-            check=False,
+            method="PATCH",
+            fields=[("new_name", label_name), ("color", color), ("description", description)],
         )
         if patch_proc.returncode == 0:
             return True
@@ -269,17 +403,7 @@ class PipelinePullRequestService:
         normalized_repo = self.normalize_repo_slug(repo_slug)
         if not normalized_repo or not pr_number:
             return set()
-        proc = self._run_process(
-            [
-                "gh",
-                "api",
-                f"repos/{normalized_repo}/issues/{pr_number}/labels",
-                "--jq",
-                ".[].name",
-            ],
-            cwd=repo_root,
-            check=False,
-        )
+        proc = self._gh_api(f"repos/{normalized_repo}/issues/{pr_number}/labels", cwd=repo_root)
         if proc.returncode != 0:
             detail = (proc.stderr or proc.stdout or "").strip()
             self._log(
@@ -288,14 +412,27 @@ class PipelinePullRequestService:
                 + (f" detail={detail}" if detail else "")
             )
             return set()
-        return {line.strip() for line in proc.stdout.splitlines() if line.strip()}
+        return self._parse_label_names(proc.stdout) or set()
+
+    def _parse_label_names(self, text: str) -> set[str] | None:
+        try:
+            payload = self._loads_json(text or "null")
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(payload, list):
+            return None
+        return {
+            str(item.get("name") or "").strip()
+            for item in payload
+            if isinstance(item, dict) and str(item.get("name") or "").strip()
+        }
 
     @staticmethod
     def resolve_pr_number(pr_ref: str) -> str:
         text = str(pr_ref).strip()
-        if re.fullmatch(r"\d+", text):
+        if text.isdecimal():
             return text
-        match = re.search(r"/pull/(\d+)", text)
+        match = PR_URL_NUMBER_PATTERN.search(text)
         if match:
             return match.group(1)
         return ""
@@ -303,7 +440,7 @@ class PipelinePullRequestService:
     @staticmethod
     def extract_trigger_reason_from_feedback_text(feedback_text: str) -> str:
         content = str(feedback_text or "")
-        match = re.search(r"(?im)^Triggered by:\s*(.+?)\s*$", content)
+        match = TRIGGERED_BY_LINE_PATTERN.search(content)
         if not match:
             return ""
         return match.group(1).strip().lower()
@@ -356,18 +493,11 @@ class PipelinePullRequestService:
         if not normalized_repo or not normalized_pr or not normalized_body:
             return False
 
-        proc = self._run_process(
-            [
-                "gh",
-                "api",
-                "-X",
-                "POST",
-                f"repos/{normalized_repo}/issues/{normalized_pr}/comments",
-                "-f",
-                f"body={normalized_body}",
-            ],
+        proc = self._gh_api(
+            f"repos/{normalized_repo}/issues/{normalized_pr}/comments",
             cwd=repo_root,
-            check=False,
+            method="POST",
+            fields=[("body", normalized_body)],
         )
         if proc.returncode != 0:
             detail = (proc.stderr or proc.stdout or "").strip()
@@ -410,41 +540,42 @@ class PipelinePullRequestService:
                 raise RuntimeError("PRラベルの解決に失敗しました。requested=" + ", ".join(requested_labels))
             return
 
+        # ラベルごとに gh を起動せず、1 回の呼び出しでまとめて追加する。
         normalized_repo = self.normalize_repo_slug(repo_slug)
-        for normalized in resolved_labels:
-            if normalized_repo:
-                proc = self._run_process(
-                    [
-                        "gh",
-                        "api",
-                        "-X",
-                        "POST",
-                        f"repos/{normalized_repo}/issues/{pr_number}/labels",
-                        "-f",
-                        f"labels[]={normalized}",
-                    ],
-                    cwd=repo_root,
-                    check=False,
-                )
-            else:
-                proc = self._run_process(
-                    ["gh", "pr", "edit", pr_number, "--add-label", normalized],
-                    cwd=repo_root,
-                    check=False,
-                )
-            if proc.returncode != 0:
-                detail = (proc.stderr or proc.stdout or "").strip()
-                self._log(
-                    "WARNING: PRラベル追加に失敗しました。"
-                    f" pr={pr_ref} number={pr_number} label={normalized}"
-                    + (f" detail={detail}" if detail else "")
-                )
+        current_labels: set[str] | None = None
+        if normalized_repo:
+            proc = self._gh_api(
+                f"repos/{normalized_repo}/issues/{pr_number}/labels",
+                cwd=repo_root,
+                method="POST",
+                fields=[("labels[]", label) for label in resolved_labels],
+            )
+            if proc.returncode == 0:
+                # 追加 API は付与後のラベル一覧を返すので、取れれば再取得を省く。
+                current_labels = self._parse_label_names(proc.stdout)
+        else:
+            add_label_args: list[str] = []
+            for label in resolved_labels:
+                add_label_args.extend(["--add-label", label])
+            proc = self._run_process(
+                ["gh", "pr", "edit", pr_number, *add_label_args],
+                cwd=repo_root,
+                check=False,
+            )
+        if proc.returncode != 0:
+            detail = (proc.stderr or proc.stdout or "").strip()
+            self._log(
+                "WARNING: PRラベル追加に失敗しました。"
+                f" pr={pr_ref} number={pr_number} labels={', '.join(resolved_labels)}"
+                + (f" detail={detail}" if detail else "")
+            )
 
-        current_labels = self.fetch_pr_label_names(
-            repo_root=repo_root,
-            repo_slug=repo_slug,
-            pr_ref=pr_ref,
-        )
+        if current_labels is None:
+            current_labels = self.fetch_pr_label_names(
+                repo_root=repo_root,
+                repo_slug=repo_slug,
+                pr_ref=pr_ref,
+            )
         applied = [label for label in resolved_labels if label in current_labels]
         if labels_required and not applied:
             raise RuntimeError(
@@ -473,7 +604,7 @@ class PipelinePullRequestService:
 
             def parse_api_json(proc: subprocess.CompletedProcess[str], endpoint: str) -> Any:
                 try:
-                    return json.loads(proc.stdout or "null")
+                    return self._loads_json(proc.stdout or "null")
                 except json.JSONDecodeError as err:
                     raise RuntimeError(f"GitHub API returned invalid JSON: {endpoint}") from err
 
@@ -501,17 +632,7 @@ class PipelinePullRequestService:
 
             def mark_pr_ready_for_review(pr_ref: str) -> None:
                 endpoint = f"repos/{normalized_repo}/pulls/{pr_ref}/ready_for_review"
-                proc = self._run_process(
-                    [
-                        "gh",
-                        "api",
-                        "-X",
-                        "POST",
-                        endpoint,
-                    ],
-                    cwd=repo_root,
-                    check=False,
-                )
+                proc = self._gh_api(endpoint, cwd=repo_root, method="POST")
                 if proc.returncode == 0:
                     return
                 detail = (proc.stderr or proc.stdout or "").strip()
@@ -534,19 +655,11 @@ class PipelinePullRequestService:
             if current:
                 number = str(current[0]["number"])
                 endpoint = f"repos/{normalized_repo}/pulls/{number}"
-                updated_proc = self._run_process(
-                    [
-                        "gh",
-                        "api",
-                        "-X",
-                        "PATCH",
-                        endpoint,
-                        "-f",
-                        f"title={title}",
-                        "-f",
-                        f"body={body_text}",
-                    ],
+                updated_proc = self._gh_api(
+                    endpoint,
                     cwd=repo_root,
+                    method="PATCH",
+                    fields=[("title", title), ("body", body_text)],
                     check=True,
                 )
                 updated_payload = parse_api_json(updated_proc, endpoint)
@@ -576,25 +689,22 @@ class PipelinePullRequestService:
                 }
 
             endpoint = f"repos/{normalized_repo}/pulls"
-            create_cmd = [
-                "gh",
-                "api",
-                "-X",
-                "POST",
-                endpoint,
-                "-f",
-                f"title={title}",
-                "-f",
-                f"head={branch_name}",
-                "-f",
-                f"base={base_branch}",
-                "-f",
-                f"body={body_text}",
+            create_fields: list[tuple[str, Any]] = [
+                ("title", title),
+                ("head", branch_name),
+                ("base", base_branch),
+                ("body", body_text),
             ]
             if draft:
-                create_cmd.extend(["-F", "draft=true"])
+                create_fields.append(("draft", True))
 
-            created_proc = self._run_process(create_cmd, cwd=repo_root, check=True)
+            created_proc = self._gh_api(
+                endpoint,
+                cwd=repo_root,
+                method="POST",
+                fields=create_fields,
+                check=True,
+            )
             created_payload = parse_api_json(created_proc, endpoint)
             pr_ref_for_label = ""
             created_pr_is_draft = False
@@ -676,7 +786,7 @@ class PipelinePullRequestService:
                 cwd=repo_root,
                 check=True,
             )
-            loaded = json.loads(existing.stdout or "[]")
+            loaded = self._loads_json(existing.stdout or "[]")
             if not isinstance(loaded, list):
                 return []
             return [item for item in loaded if isinstance(item, dict)]
@@ -4,10 +4,14 @@
 from __future__ import annotations
 
 import argparse
-from copy import deepcopy
+import time
 from pathlib import Path
 from typing import Any, Callable
 
+TARGET_FETCH_TTL_SECONDS = 60
+# fetch --all の成功時だけ更新する印。FETCH_HEAD は ensure_branch の個別 fetch でも書き換わるため使わない。
+TARGET_FETCH_STAMP_FILE = "flowsmith-fetch-all.stamp"
+
 
 class PipelineRuntimeService:
     """Encapsulates target-repo preparation and runtime config resolution."""
@@ -46,15 +50,19 @@ class PipelineRuntimeService:
         clone_url: str,
         repo_slug: str,
         sync_target: bool,
-    ) -> None:
+        fetch_ttl_seconds: int = TARGET_FETCH_TTL_SECONDS,
+        base_branch: str = "",
+    ) -> bool:
         if target_repo_root.exists():
             if not (target_repo_root / ".git").exists():
                 raise RuntimeError(
                     f"Target path exists but is not a git repository: {target_repo_root}"
                 )
-            if sync_target:
-                self._git(["fetch", "--all", "--prune"], cwd=target_repo_root, check=False)
-            return
+            if sync_target and not self._fetched_recently(target_repo_root, fetch_ttl_seconds):
+                fetched = self._git(["fetch", "--all", "--prune"], cwd=target_repo_root, check=False)
+                if fetched.returncode == 0:
+                    self._touch_fetch_stamp(target_repo_root)
+            return False
 
         effective_clone_url = clone_url.strip()
         if not effective_clone_url and repo_slug:
@@ -67,10 +75,53 @@ class PipelineRuntimeService:
             )
 
         target_repo_root.parent.mkdir(parents=True, exist_ok=True)
+        # blob は checkout 時に遅延取得させ、初回 clone の転送量を抑える。
+        # --single-branch は後続の fetch 対象まで絞ってしまうため使わない。
+        branch_args = ["--branch", base_branch] if base_branch else []
+        partial = self._run_process(
+            [
+                "git",
+                "clone",
+                "--filter=blob:none",
+                *branch_args,
+                effective_clone_url,
+                str(target_repo_root),
+            ],
+            check=False,
+        )
+        if partial.returncode == 0:
+            return True
+        if target_repo_root.exists():
+            detail = (partial.stderr or partial.stdout or "").strip()
+            raise RuntimeError(
+                f"Partial clone failed and left {target_repo_root} behind.\n"
+                + (f"detail:\n{detail}" if detail else "")
+            )
+        # partial clone 非対応のサーバ（やブランチ指定の失敗）では従来の完全 clone に戻す。
         self._run_process(
             ["git", "clone", effective_clone_url, str(target_repo_root)],
             check=True,
         )
+        return True
+
+    @staticmethod
+    def _fetched_recently(target_repo_root: Path, ttl_seconds: int) -> bool:
+        # 直前の fetch から TTL 以内なら連続実行での再 fetch を省く（0 以下で無効）。
+        if ttl_seconds <= 0:
+            return False
+        try:
+            fetched_at = (target_repo_root / ".git" / TARGET_FETCH_STAMP_FILE).stat().st_mtime
+        except OSError:
+            return False
+        return 0 <= time.time() - fetched_at < ttl_seconds
+
+    @staticmethod
+    def _touch_fetch_stamp(target_repo_root: Path) -> None:
+        # 印を書けなくても次回 fetch し直すだけなので、失敗は無視する。
+        try:
+            (target_repo_root / ".git" / TARGET_FETCH_STAMP_FILE).touch()
+        except OSError:
+            pass
 
     def load_project_manifest(self, path: Path) -> dict[str, Any]:
         payload = self._load_json(path)
@@ -79,6 +130,15 @@ class PipelineRuntimeService:
             raise RuntimeError(f"Invalid projects manifest ({path}): 'projects' must be an object.")
         return payload
 
+    @staticmethod
+    def _resolve_fetch_ttl_seconds(project: dict[str, Any], project_id: str) -> int:
+        value = project.get("fetch_ttl_seconds", TARGET_FETCH_TTL_SECONDS)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise RuntimeError(
+                f"Project '{project_id}': 'fetch_ttl_seconds' must be an integer."
+            )
+        return value
+
     def resolve_runtime(
         self,
         *,
@@ -99,7 +159,9 @@ class PipelineRuntimeService:
         default_base_branch = ""
         config_base_dir = base_config_path.parent
         config_validation_path = base_config_path
-        config = deepcopy(base_config)
+        # base_config はここで読み込んだばかりで他から参照されないため、複製せずにそのまま使う。
+        config = base_config
+        freshly_cloned = False
 
         if args.project:
             project_id = args.project
@@ -132,11 +194,13 @@ class PipelineRuntimeService:
             repo_slug = self._normalize_repo_slug(args.target_repo or project.get("repo", ""))
             clone_url = str(project.get("clone_url", "")).strip()
 
-            self.prepare_target_repo(
+            freshly_cloned = self.prepare_target_repo(
                 target_repo_root=target_repo_root,
                 clone_url=clone_url,
                 repo_slug=repo_slug,
                 sync_target=not args.no_sync,
+                fetch_ttl_seconds=self._resolve_fetch_ttl_seconds(project, project_id),
+                base_branch=str(project.get("base_branch", "")).strip(),
             )
 
             if not repo_slug:
@@ -161,7 +225,7 @@ class PipelineRuntimeService:
                     target_repo_root = (
                         control_root / ".agent" / "workspaces" / self._slugify(repo_slug, max_len=80)
                     ).resolve()
-                self.prepare_target_repo(
+                freshly_cloned = self.prepare_target_repo(
                     target_repo_root=target_repo_root,
                     clone_url="",
                     repo_slug=repo_slug,
@@ -196,6 +260,7 @@ class PipelineRuntimeService:
             "repo_slug": repo_slug,
             "default_base_branch": default_base_branch,
             "run_namespace": run_namespace,
+            "target_freshly_cloned": freshly_cloned,
         }
 
     def parse_args(self) -> argparse.Namespace:
@@ -3,12 +3,41 @@
 
 from __future__ import annotations
 
+import functools
+import io
+import os
 import re
-import sys
 from pathlib import Path
 from typing import Any, Callable
 
 
+# 見出し・箇条書き・番号付きリストの接頭辞を、この順に 1 回の置換でまとめて外す。
+# 各グループは任意なので、「## 1. 手順」のような重なりも従来の 3 段階置換と同じ結果になる。
+MARKDOWN_PREFIX_PATTERN = re.compile(r"^(?:\s{0,3}#{1,6}\s*)?(?:\s*[-*+]\s+)?(?:\s*\d+[.)]\s+)?")
+SHORT_ALNUM_PATTERN = re.compile(r"[a-z0-9]+")
+GENERIC_HIGHLIGHT_TOKENS = frozenset(
+    {
+        "plan",
+        "review",
+        "summary",
+        "overview",
+        "scope",
+        "notes",
+        "todo",
+        "概要",
+        "要約",
+        "実装計画",
+        "検証結果",
+        "レビューレポート",
+    }
+)
+FILE_HIGHLIGHT_CACHE_LIMIT = 256
+SUMMARY_HIGHLIGHT_WORKERS = 4
+VALIDATION_FAIL_PATTERN = re.compile(r"FAIL", flags=re.IGNORECASE)
+VALIDATION_PASS_PATTERN = re.compile(r"PASS", flags=re.IGNORECASE)
+ATTEMPT_LOG_FILE_PATTERN = re.compile(r"(?:coder_output|validation)_attempt_(\d+)\.md")
+
+
 class PipelineCommitSummaryService:
     """Encapsulates summary extraction and commit appendix generation."""
 
@@ -21,7 +50,6 @@ class PipelineCommitSummaryService:
         parse_positive_int: Callable[..., int],
         format_template: Callable[..., str],
         normalize_repo_path: Callable[[str], str],
-        extract_attempt_index: Callable[[str], int],
         read_text: Callable[[Path], str],
         write_text: Callable[[Path, str], None],
         log: Callable[[str], None],
@@ -32,51 +60,36 @@ class PipelineCommitSummaryService:
         self._parse_positive_int = parse_positive_int
         self._format_template = format_template
         self._normalize_repo_path = normalize_repo_path
-        self._extract_attempt_index = extract_attempt_index
         self._read_text = read_text
         self._write_text = write_text
         self._log = log
+        self._file_highlight_cache: dict[tuple[str, int, int, int, int], list[str]] = {}
 
     def strip_markdown_prefix(self, line: str) -> str:
         text = line.strip()
         if not text:
             return ""
-        text = re.sub(r"^\s{0,3}#{1,6}\s*", "", text)
-        text = re.sub(r"^\s*[-*+]\s+", "", text)
-        text = re.sub(r"^\s*\d+[.)]\s+", "", text)
+        text = MARKDOWN_PREFIX_PATTERN.sub("", text, count=1)
         return self._normalize_inline_text(text)
 
     def is_noninformative_highlight(self, text: str) -> bool:
         normalized = self._normalize_inline_text(text).lower()
         if not normalized:
             return True
-        generic_tokens = {
-            "plan",
-            "review",
-            "summary",
-            "overview",
-            "scope",
-            "notes",
-            "todo",
-            "概要",
-            "要約",
-            "実装計画",
-            "検証結果",
-            "レビューレポート",
-        }
-        if normalized in generic_tokens:
+        if normalized in GENERIC_HIGHLIGHT_TOKENS:
             return True
-        if len(normalized) <= 2 and re.fullmatch(r"[a-z0-9]+", normalized):
+        if len(normalized) <= 2 and SHORT_ALNUM_PATTERN.fullmatch(normalized):
             return True
         return False
 
     def extract_text_highlights(self, raw_text: str, *, max_items: int, max_chars: int) -> list[str]:
         if max_items <= 0:
             return []
-        lines = raw_text.splitlines()
         highlights: list[str] = []
         in_code_block = False
-        for line in lines:
+        # 必要件数が揃えば打ち切るため、全行のリストは作らずに 1 行ずつ読む。
+        for line in io.StringIO(raw_text, newline=None):
+            line = line.rstrip("\n")
             stripped = line.strip()
             if stripped.startswith("```") or stripped.startswith("~~~"):
                 in_code_block = not in_code_block
@@ -98,12 +111,36 @@ class PipelineCommitSummaryService:
         return [fallback or "(empty)"]
 
     def extract_file_highlights(self, path: Path, *, max_items: int, max_chars: int) -> list[str]:
-        if not path.exists():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
             return ["(missing)"]
+        # 再試行や複数回の要約生成で同じログを読み直さないよう、更新時刻とサイズが変わらない限り結果を使い回す。
+        key = (str(path), stat.st_mtime_ns, stat.st_size, max_items, max_chars)
+        cached = self._file_highlight_cache.get(key)
+        if cached is not None:
+            return list(cached)
         content = self._read_text(path).strip()
         if not content:
-            return ["(empty)"]
-        return self.extract_text_highlights(content, max_items=max_items, max_chars=max_chars)
+            highlights = ["(empty)"]
+        else:
+            highlights = self.extract_text_highlights(content, max_items=max_items, max_chars=max_chars)
+        if len(self._file_highlight_cache) >= FILE_HIGHLIGHT_CACHE_LIMIT:
+            self._file_highlight_cache.clear()
+        self._file_highlight_cache[key] = highlights
+        return list(highlights)
+
+    def extract_validation_file(self, path: Path, *, max_items: int, max_chars: int) -> tuple[list[str], str]:
+        # 検証ログは要点抽出と PASS/FAIL 判定の両方に使うため、1 回の読み込みで両方を求める。
+        if not path.exists():
+            return ["(missing)"], self.detect_attempt_status("")
+        raw_text = self._read_text(path)
+        content = raw_text.strip()
+        if not content:
+            highlights = ["(empty)"]
+        else:
+            highlights = self.extract_text_highlights(content, max_items=max_items, max_chars=max_chars)
+        return highlights, self.detect_attempt_status(raw_text)
 
     def first_meaningful(self, items: list[str], *, fallback: str) -> str:
         for item in items:
@@ -114,10 +151,10 @@ class PipelineCommitSummaryService:
 
     @staticmethod
     def detect_attempt_status(validation_text: str) -> str:
-        upper = validation_text.upper()
-        if "FAIL" in upper:
+        # 本文全体の大文字コピーを作らずに大小無視で探す。FAIL が 1 件でもあれば PASS より優先する。
+        if VALIDATION_FAIL_PATTERN.search(validation_text):
             return "failed"
-        if "PASS" in upper:
+        if VALIDATION_PASS_PATTERN.search(validation_text):
             return "passed"
         return "unknown"
 
@@ -179,7 +216,7 @@ class PipelineCommitSummaryService:
             quality_gate_lines: list[str] = []
             if isinstance(quality_gates, list):
                 for gate in quality_gates:
-                    gate_text = str(gate).strip()
+                    gate_text = str(gate.get("command", "") if isinstance(gate, dict) else gate).strip()
                     if gate_text:
                         quality_gate_lines.append(f"`{gate_text}`")
 
@@ -204,37 +241,59 @@ class PipelineCommitSummaryService:
                 max_chars=max_chars,
             )
 
+            # coder_output / validation の両方を 1 回のディレクトリ走査で拾う。
             attempt_ids: set[int] = set()
-            for path in run_dir.glob("coder_output_attempt_*.md"):
-                idx = self._extract_attempt_index(path.name)
-                if idx != sys.maxsize:
-                    attempt_ids.add(idx)
-            for path in run_dir.glob("validation_attempt_*.md"):
-                idx = self._extract_attempt_index(path.name)
-                if idx != sys.maxsize:
-                    attempt_ids.add(idx)
+            try:
+                with os.scandir(run_dir) as entries:
+                    for entry in entries:
+                        match = ATTEMPT_LOG_FILE_PATTERN.fullmatch(entry.name)
+                        if match:
+                            attempt_ids.add(int(match.group(1)))
+            except FileNotFoundError:
+                pass
 
             attempt_rows: list[dict[str, Any]] = []
             last_validation_lines: list[str] = ["(missing)"]
-            for idx in sorted(attempt_ids)[:max_attempts]:
-                coder_prompt_points = self.extract_file_highlights(
-                    run_dir / f"coder_prompt_attempt_{idx}.md",
-                    max_items=1,
-                    max_chars=max_chars,
-                )
-                coder_points = self.extract_file_highlights(
-                    run_dir / f"coder_output_attempt_{idx}.md",
-                    max_items=1,
-                    max_chars=max_chars,
+            selected_attempt_ids = sorted(attempt_ids)[:max_attempts]
+            highlight_jobs: list[Callable[[], Any]] = []
+            for idx in selected_attempt_ids:
+                highlight_jobs.extend(
+                    [
+                        functools.partial(
+                            self.extract_file_highlights,
+                            run_dir / f"coder_prompt_attempt_{idx}.md",
+                            max_items=1,
+                            max_chars=max_chars,
+                        ),
+                        functools.partial(
+                            self.extract_file_highlights,
+                            run_dir / f"coder_output_attempt_{idx}.md",
+                            max_items=1,
+                            max_chars=max_chars,
+                        ),
+                        functools.partial(
+                            self.extract_validation_file,
+                            run_dir / f"validation_attempt_{idx}.md",
+                            max_items=max_points,
+                            max_chars=max_chars,
+                        ),
+                    ]
                 )
-                validation_path = run_dir / f"validation_attempt_{idx}.md"
-                validation_points = self.extract_file_highlights(
-                    validation_path,
-                    max_items=max_points,
-                    max_chars=max_chars,
-                )
-                validation_raw = self._read_text(validation_path) if validation_path.exists() else ""
-                status = self.detect_attempt_status(validation_raw)
+            # 試行ごとのログ読み込みは I/O 待ちが主なので、スレッドで並行して抽出する。
+            highlight_results: list[Any] = []
+            if highlight_jobs:
+                # concurrent.futures は読み込みが重いため、要約生成時にだけ読み込む。
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(
+                    max_workers=min(SUMMARY_HIGHLIGHT_WORKERS, len(highlight_jobs))
+                ) as executor:
+                    highlight_results = list(executor.map(lambda job: job(), highlight_jobs))
+
+            for position, idx in enumerate(selected_attempt_ids):
+                coder_prompt_points, coder_points, (validation_points, status) = highlight_results[
+                    position * 3 : position * 3 + 3
+                ]
                 goal = self.first_meaningful(
                     coder_prompt_points,
                     fallback="要件実装のための変更を実施",
@@ -380,9 +439,18 @@ class PipelineCommitSummaryService:
                     f"- AI Logs: {evidence_path}",
                 ]
             )
-            appendix_text = "\n".join(appendix_lines).strip()
-            if len(appendix_text) > max_total_chars:
-                appendix_text = self._clip_text(appendix_text, max_chars=max_total_chars).strip()
+            # 先頭・末尾の行は固定文言なので strip は不要。上限を超えた時点で以降の行は
+            # 切り詰めで捨てられるため、連結もそこで打ち切る。
+            kept_lines: list[str] = []
+            joined_length = -1
+            for line in appendix_lines:
+                kept_lines.append(line)
+                joined_length += len(line) + 1
+                if joined_length > max_total_chars:
+                    break
+            appendix_text = "\n".join(kept_lines)
+            if joined_length > max_total_chars:
+                appendix_text = self._clip_text(appendix_text, max_chars=max_total_chars)
 
             request_lines = [f"- {item}" for item in issue_points]
             validation_result_lines = [f"- {item}" for item in last_validation_lines]
@@ -437,7 +505,7 @@ class PipelineCommitSummaryService:
                 f"- ai-logs: `{evidence_path}`",
                 f"- run_dir: `{run_dir}`",
             ]
-            markdown_text = "\n".join(markdown_lines).strip()
+            markdown_text = "\n".join(markdown_lines)
         except (RuntimeError, OSError) as err:
             if required:
                 raise RuntimeError(f"Codex要約生成に失敗しました: {err}") from err
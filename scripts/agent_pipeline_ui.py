@@ -22,6 +22,7 @@ class PipelineUiEvidenceService:
         normalize_repo_slug: Callable[[str], str],
         slugify: Callable[..., str],
         git: Callable[..., Any],
+        git_cat_file_batch: Callable[[Path], Any],
         log: Callable[[str], None],
     ) -> None:
         self._normalize_repo_path = normalize_repo_path
@@ -31,6 +32,7 @@ class PipelineUiEvidenceService:
         self._normalize_repo_slug = normalize_repo_slug
         self._slugify = slugify
         self._git = git
+        self._git_cat_file_batch = git_cat_file_batch
         self._log = log
 
     def normalize_extensions(self, values: list[str]) -> list[str]:
@@ -350,41 +352,36 @@ class PipelineUiEvidenceService:
         relative_paths: list[str],
     ) -> list[str]:
         removed: list[str] = []
-        for relative_path in sorted(
-            {
-                self._normalize_repo_path(str(item))
-                for item in relative_paths
-                if str(item).strip()
-            }
-        ):
-            self._git(
-                ["restore", "--staged", "--worktree", "--source=HEAD", "--", relative_path],
-                cwd=repo_root,
-                check=False,
-            )
-            tracked = (
+        # HEAD から restore した後に追跡されているのは HEAD に存在するパスだけなので、
+        # パスごとに ls-files を起動せず、常駐させた cat-file 1 プロセスで HEAD を引く。
+        with self._git_cat_file_batch(repo_root) as head_lookup:
+            for relative_path in sorted(
+                {
+                    self._normalize_repo_path(str(item))
+                    for item in relative_paths
+                    if str(item).strip()
+                }
+            ):
                 self._git(
-                    ["ls-files", "--error-unmatch", "--", relative_path],
+                    ["restore", "--staged", "--worktree", "--source=HEAD", "--", relative_path],
                     cwd=repo_root,
                     check=False,
-                ).returncode
-                == 0
-            )
-            if tracked:
-                removed.append(relative_path)
-                continue
-            resolved = self._resolve_repo_relative_path(
-                relative_path,
-                repo_root=repo_root,
-                setting_name="ui_evidence.evidence_images",
-            )
-            if resolved.is_file():
-                resolved.unlink()
-                removed.append(relative_path)
-                continue
-            if resolved.is_dir():
-                shutil.rmtree(resolved, ignore_errors=True)
-                removed.append(relative_path)
+                )
+                if head_lookup.exists(f"HEAD:{relative_path}"):
+                    removed.append(relative_path)
+                    continue
+                resolved = self._resolve_repo_relative_path(
+                    relative_path,
+                    repo_root=repo_root,
+                    setting_name="ui_evidence.evidence_images",
+                )
+                if resolved.is_file():
+                    resolved.unlink()
+                    removed.append(relative_path)
+                    continue
+                if resolved.is_dir():
+                    shutil.rmtree(resolved, ignore_errors=True)
+                    removed.append(relative_path)
         return removed
 
     def build_ui_evidence_state(